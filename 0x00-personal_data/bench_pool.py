@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Benchmark of ConnectionPool reuse and checkout latency against SQLite,
+so it runs without a MySQL server.
+"""
+
+import os
+import sqlite3
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable
+
+from filtered_logger import ConnectionPool
+
+
+def query(conn) -> None:
+    """Run the kind of short query a request makes."""
+    cursor = conn.cursor()
+    cursor.execute("SELECT COUNT(*) FROM users")
+    cursor.fetchall()
+    cursor.close()
+
+
+def run_threads(threads: int, per_thread: int,
+                work: Callable[[], None]) -> float:
+    """Run `work` per_thread times on each of `threads` threads and
+    return the elapsed seconds."""
+    def worker() -> None:
+        """Repeat the work."""
+        for _ in range(per_thread):
+            work()
+
+    pool = [threading.Thread(target=worker) for _ in range(threads)]
+    start = time.perf_counter()
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    """Compare a connection per query with pooled checkouts."""
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    per_thread = int(sys.argv[2]) if len(sys.argv) > 2 else 2000
+    size = int(sys.argv[3]) if len(sys.argv) > 3 else 4
+    path = os.path.join(tempfile.mkdtemp(), "bench.db")
+    with sqlite3.connect(path) as conn:
+        conn.execute("CREATE TABLE users (name TEXT)")
+        conn.executemany("INSERT INTO users VALUES (?)",
+                         [(f"user{i}",) for i in range(100)])
+
+    def factory():
+        """Open a connection usable from any thread."""
+        return sqlite3.connect(path, check_same_thread=False)
+
+    def unpooled() -> None:
+        """Open, use and close a connection."""
+        conn = factory()
+        query(conn)
+        conn.close()
+
+    total = threads * per_thread
+    elapsed = run_threads(threads, per_thread, unpooled)
+    print(f"no pool : {total / elapsed:9.0f} queries/s  "
+          f"{total} connections opened")
+
+    pool = ConnectionPool(factory, size)
+
+    def pooled() -> None:
+        """Check out a connection, use it and return it."""
+        with pool.connection() as conn:
+            query(conn)
+
+    elapsed = run_threads(threads, per_thread, pooled)
+    stats = pool.stats()
+    print(f"pool {size:>3}: {total / elapsed:9.0f} queries/s  "
+          f"{stats['created']} connections opened  "
+          f"{stats['reused']} of {stats['checkouts']} checkouts reused  "
+          f"checkout avg {stats['avg_checkout'] * 1e6:.1f} us  "
+          f"max {stats['max_checkout'] * 1e3:.2f} ms")
+    pool.close()
+    os.remove(path)
+
+
+if __name__ == "__main__":
+    main()
@@ -3,14 +3,27 @@
 Module for encrypting and validating passwords using bcrypt.
 """
 
+import asyncio
+import os
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
 import bcrypt
 
 
-def hash_password(password: str) -> bytes:
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+def hash_password(password: str, rounds: int = DEFAULT_ROUNDS) -> bytes:
     """
     Hashes a password using bcrypt with salt.
     """
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds)
     return bcrypt.hashpw(password.encode('utf-8'), salt)
 
 
@@ -19,3 +32,213 @@ def is_valid(hashed_password: bytes, password: str) -> bool:
     Validates a password against its hashed version.
     """
     return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+
+def hash_rounds(hashed_password: bytes) -> int:
+    """
+    Returns the cost factor encoded in a bcrypt hash ($2b$<rounds>$...).
+    """
+    return int(hashed_password.split(b'$')[2])
+
+
+def needs_rehash(hashed_password: bytes, rounds: int) -> bool:
+    """
+    Tells whether a stored hash was made with a different cost factor.
+    """
+    return hash_rounds(hashed_password) != rounds
+
+
+def calibrate_rounds(target_ms: float = 50.0) -> int:
+    """
+    Benchmarks bcrypt on this machine and returns the highest cost factor
+    whose hashing time stays within target_ms. Each extra round doubles
+    the work, so calibration itself costs about twice the target.
+    """
+    rounds = MIN_ROUNDS
+    while rounds < MAX_ROUNDS:
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration', bcrypt.gensalt(rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms * 2 > target_ms:
+            break
+        rounds += 1
+    return rounds
+
+
+class PasswordHasher:
+    """
+    Bounded thread pool running bcrypt off the calling thread.
+
+    bcrypt releases the GIL while hashing, so up to max_workers calls run
+    in parallel. Once max_pending calls are in flight, submit blocks the
+    caller instead of growing the queue; the async variants wait for a
+    slot without blocking the event loop.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 rounds: int = DEFAULT_ROUNDS):
+        """
+        Starts the worker pool; new hashes use the given cost factor.
+        """
+        self.rounds = rounds
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self._executor = ThreadPoolExecutor(self.max_workers,
+                                            thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._queued = 0
+        self._started = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _run(self, submitted: float, func: Callable, *args):
+        """
+        Records how long the call waited for a worker, then runs it.
+        """
+        wait = time.monotonic() - submitted
+        with self._lock:
+            self._queued -= 1
+            self._started += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        return func(*args)
+
+    def _submit(self, func: Callable, *args) -> Future:
+        """
+        Schedules func on the pool once a pending slot is free.
+        """
+        self._slots.acquire()
+        return self._schedule(func, *args)
+
+    async def _submit_async(self, func: Callable, *args):
+        """
+        Waits for a pending slot without blocking the event loop, then
+        runs func on the pool and awaits its result.
+
+        A full pool parks the coroutine on a future of its own loop, which
+        the completion of another call hands its slot to.
+        """
+        if not self._slots.acquire(blocking=False):
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            with self._lock:
+                granted = self._slots.acquire(blocking=False)
+                if not granted:
+                    self._waiters.append((loop, waiter))
+            if not granted:
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    with self._lock:
+                        if (loop, waiter) in self._waiters:
+                            self._waiters.remove((loop, waiter))
+                    if waiter.done() and not waiter.cancelled():
+                        self._release()
+                    raise
+        return await asyncio.wrap_future(self._schedule(func, *args))
+
+    def _release(self) -> None:
+        """
+        Hands a freed slot to the oldest async waiter, or returns it
+        to the semaphore.
+        """
+        with self._lock:
+            if not self._waiters:
+                self._slots.release()
+                return
+            loop, waiter = self._waiters.popleft()
+        try:
+            loop.call_soon_threadsafe(self._grant, waiter)
+        except RuntimeError:
+            self._release()
+
+    def _grant(self, waiter: asyncio.Future) -> None:
+        """
+        Wakes a waiter with the slot, passing the slot on if it was
+        cancelled meanwhile; runs on the loop of the waiter.
+        """
+        if waiter.cancelled():
+            self._release()
+        else:
+            waiter.set_result(None)
+
+    def _schedule(self, func: Callable, *args) -> Future:
+        """
+        Schedules func on the pool; the caller holds a pending slot, which
+        is released when the call completes.
+        """
+        with self._lock:
+            self._queued += 1
+        try:
+            future = self._executor.submit(self._run, time.monotonic(),
+                                           func, *args)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def submit_hash(self, password: str) -> Future:
+        """
+        Returns a future resolving to the bcrypt hash of password.
+        """
+        return self._submit(hash_password, password, self.rounds)
+
+    def submit_verify(self, hashed_password: bytes, password: str) -> Future:
+        """
+        Returns a future resolving to whether password matches the hash.
+        """
+        return self._submit(is_valid, hashed_password, password)
+
+    async def hash_async(self, password: str) -> bytes:
+        """
+        Awaitable variant of submit_hash.
+        """
+        return await self._submit_async(hash_password, password, self.rounds)
+
+    async def verify_async(self, hashed_password: bytes,
+                           password: str) -> bool:
+        """
+        Awaitable variant of submit_verify.
+        """
+        return await self._submit_async(is_valid, hashed_password,
+                                        password)
+
+    def hash_many(self, passwords: Iterable[str]) -> List[bytes]:
+        """
+        Hashes several passwords in parallel, preserving order.
+        """
+        futures = [self.submit_hash(password) for password in passwords]
+        return [future.result() for future in futures]
+
+    def verify_many(self, pairs: Iterable[Tuple[bytes, str]]) -> List[bool]:
+        """
+        Verifies several (hashed_password, password) pairs in parallel.
+        """
+        futures = [self.submit_verify(hashed, password)
+                   for hashed, password in pairs]
+        return [future.result() for future in futures]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Returns backpressure metrics: calls waiting for a worker and the
+        mean and max time spent waiting, in seconds.
+        """
+        with self._lock:
+            return {
+                'queue_depth': self._queued,
+                'started': self._started,
+                'avg_wait': self._total_wait / max(self._started, 1),
+                'max_wait': self._max_wait,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stops the worker pool.
+        """
+        self._executor.shutdown(wait=wait)
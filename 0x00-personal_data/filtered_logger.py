@@ -4,23 +4,39 @@ Module for filtering and obfuscating personal data in logs.
 """
 
 import re
+import argparse
+import atexit
 import logging
+import logging.handlers
 import os
+import queue
+import threading
+import time
 import mysql.connector
-from typing import List, Optional
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import (Any, Callable, Iterator, List, Optional, Pattern,
+                    Tuple)
 
 
 PII_FIELDS = ("name", "email", "phone", "ssn", "password")
 
 
+@lru_cache(maxsize=128)
+def _redaction_pattern(fields: Tuple[str, ...],
+                       separator: str) -> Pattern[str]:
+    """Compile a single alternation pattern matching any of the fields."""
+    return re.compile(f'({"|".join(fields)})=[^{separator}]*')
+
+
 def filter_datum(fields: List[str], redaction: str,
                  message: str, separator: str) -> str:
     """Obfuscates specified fields in a log message."""
-    for field in fields:
-        message = re.sub(
-                f'{field}=[^{separator}]*',
-                f'{field}={redaction}', message)
-    return message
+    if not fields:
+        return message
+    pattern = _redaction_pattern(tuple(fields), separator)
+    return pattern.sub(lambda match: f'{match.group(1)}={redaction}',
+                       message)
 
 
 class RedactingFormatter(logging.Formatter):
@@ -43,8 +59,72 @@ class RedactingFormatter(logging.Formatter):
         return super().format(record)
 
 
-def get_logger() -> logging.Logger:
-    """Create and configure a logger for user data with PII redaction."""
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """Queue handler that defers formatting to the listener thread and
+    applies an overflow policy when the bounded queue is full."""
+
+    OVERFLOW_POLICIES = ("block", "drop_oldest", "drop_newest")
+
+    def __init__(self, log_queue: queue.Queue, overflow: str = "block"):
+        """Initialize handler with a bounded queue and overflow policy."""
+        if overflow not in self.OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow}")
+        super().__init__(log_queue)
+        self.overflow = overflow
+        self.dropped = 0
+        self._dropped_lock = threading.Lock()
+
+    def _count_drop(self) -> None:
+        """Increment the dropped records counter."""
+        with self._dropped_lock:
+            self.dropped += 1
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """Leave redaction and formatting to the listener thread."""
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Enqueue a record according to the overflow policy."""
+        if self.overflow == "block":
+            self.queue.put(record)
+            return
+        try:
+            self.queue.put_nowait(record)
+            return
+        except queue.Full:
+            if self.overflow == "drop_newest":
+                self._count_drop()
+                return
+        while True:
+            try:
+                self.queue.get_nowait()
+                self._count_drop()
+            except queue.Empty:
+                pass
+            try:
+                self.queue.put_nowait(record)
+                return
+            except queue.Full:
+                continue
+
+
+class DrainingQueueListener(logging.handlers.QueueListener):
+    """Queue listener whose stop() waits for room to enqueue its sentinel
+    so every record already queued is written before exit."""
+
+    def enqueue_sentinel(self) -> None:
+        """Block until the sentinel fits in the bounded queue."""
+        self.queue.put(self._sentinel)
+
+
+def get_logger(asynchronous: bool = False, queue_size: int = 10000,
+               overflow: str = "block") -> logging.Logger:
+    """Create and configure a logger for user data with PII redaction.
+
+    With asynchronous=True, records go through a bounded queue and a
+    background listener thread performs redaction, formatting and the
+    stream write. The listener is flushed and stopped at interpreter exit.
+    """
     logger = logging.getLogger("user_data")
     logger.setLevel(logging.INFO)
     logger.propagate = False
@@ -53,7 +133,18 @@ def get_logger() -> logging.Logger:
     formatter = RedactingFormatter(PII_FIELDS)
     stream_handler.setFormatter(formatter)
 
-    logger.addHandler(stream_handler)
+    if not asynchronous:
+        logger.addHandler(stream_handler)
+        return logger
+
+    log_queue = queue.Queue(maxsize=queue_size)
+    queue_handler = BoundedQueueHandler(log_queue, overflow)
+    listener = DrainingQueueListener(log_queue, stream_handler)
+    queue_handler.listener = listener
+    listener.start()
+    atexit.register(listener.stop)
+
+    logger.addHandler(queue_handler)
     return logger
 
 
@@ -73,19 +164,189 @@ def get_db() -> mysql.connector.connection.MySQLConnection:
     )
 
 
+def _ping(conn) -> bool:
+    """Return True if a round trip on the connection succeeds."""
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        cursor.close()
+        return True
+    except Exception:
+        return False
+
+
+class ConnectionPool:
+    """Fixed-size pool of database connections checked on checkout.
+
+    Connections come from `factory` (get_db by default, so the same
+    PERSONAL_DATA_DB_* variables apply); any DB-API connection factory
+    can be used instead. Connections move between threads, so a SQLite
+    factory must pass check_same_thread=False, e.g.
+    `lambda: sqlite3.connect(path, check_same_thread=False)`; otherwise
+    the health check fails on other threads and every such checkout
+    opens a new connection.
+    """
+
+    def __init__(self, factory: Optional[Callable[[], Any]] = None,
+                 size: int = 5, health_check: Callable[[Any], bool] = _ping):
+        """Initialize an empty pool holding at most `size` connections."""
+        if size < 1:
+            raise ValueError("Pool size must be at least 1")
+        self.size = size
+        self.created = 0
+        self.checkouts = 0
+        self._checkout_time = 0.0
+        self._max_checkout_time = 0.0
+        self._factory = factory or get_db
+        self._health_check = health_check
+        self._idle = queue.LifoQueue(maxsize=size)
+        self._slots = threading.BoundedSemaphore(size)
+        self._stats_lock = threading.Lock()
+
+    def acquire(self, timeout: Optional[float] = None) -> Any:
+        """Check out a healthy connection, opening one if none is idle."""
+        start = time.perf_counter()
+        if not self._slots.acquire(timeout=timeout):
+            raise TimeoutError("No database connection available")
+        try:
+            while True:
+                try:
+                    conn = self._idle.get_nowait()
+                except queue.Empty:
+                    conn = self._factory()
+                    with self._stats_lock:
+                        self.created += 1
+                    break
+                if self._health_check(conn):
+                    break
+                self._discard(conn)
+        except Exception:
+            self._slots.release()
+            raise
+        elapsed = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self._checkout_time += elapsed
+            self._max_checkout_time = max(self._max_checkout_time, elapsed)
+        return conn
+
+    def stats(self) -> dict:
+        """Return reuse and checkout latency metrics: connections opened,
+        checkouts, checkouts served by a reused connection, and the mean
+        and max seconds a checkout took (waiting for a slot included).
+        """
+        with self._stats_lock:
+            return {
+                'created': self.created,
+                'checkouts': self.checkouts,
+                'reused': self.checkouts - self.created,
+                'avg_checkout': self._checkout_time / max(self.checkouts, 1),
+                'max_checkout': self._max_checkout_time,
+            }
+
+    def release(self, conn: Any) -> None:
+        """Return a checked out connection to the pool."""
+        self._idle.put_nowait(conn)
+        self._slots.release()
+
+    @contextmanager
+    def connection(self, timeout: Optional[float] = None) -> Iterator[Any]:
+        """Context manager returning the connection to the pool on exit.
+
+        A connection whose block raised, including KeyboardInterrupt or
+        GeneratorExit, is closed instead of reused; the slot is always
+        given back.
+        """
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        except BaseException:
+            self._discard(conn)
+            raise
+        else:
+            self._idle.put_nowait(conn)
+        finally:
+            self._slots.release()
+
+    def close(self) -> None:
+        """Close every idle connection."""
+        while True:
+            try:
+                self._discard(self._idle.get_nowait())
+            except queue.Empty:
+                return
+
+    @staticmethod
+    def _discard(conn: Any) -> None:
+        """Close a connection, ignoring errors from dead connections."""
+        try:
+            conn.close()
+        except Exception:
+            pass
+
+
+def get_db_pool(size: Optional[int] = None,
+                factory: Optional[Callable[[], Any]] = None
+                ) -> ConnectionPool:
+    """Create a connection pool sized by PERSONAL_DATA_DB_POOL_SIZE."""
+    if size is None:
+        size = int(os.getenv('PERSONAL_DATA_DB_POOL_SIZE', 5))
+    return ConnectionPool(factory, size)
+
+
+def export_users(db: mysql.connector.connection.MySQLConnection,
+                 logger: logging.Logger, batch_size: int = 1000,
+                 where: Optional[str] = None,
+                 limit: Optional[int] = None) -> int:
+    """Stream the users table through the logger in fetchmany batches.
+
+    The cursor is unbuffered and the message template is built once from
+    the column order, so client memory stays bounded by batch_size.
+    Returns the number of exported rows.
+    """
+    query = "SELECT * FROM users"
+    params = ()
+    if where:
+        query += f" WHERE {where}"
+    if limit is not None:
+        query += " LIMIT %s"
+        params = (limit,)
+
+    cursor = db.cursor(buffered=False)
+    cursor.execute(query, params)
+    template = "; ".join(f"{column}={{}}" for column in cursor.column_names)
+
+    exported = 0
+    try:
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                logger.info(template.format(*row))
+            exported += len(rows)
+    finally:
+        cursor.close()
+    return exported
+
+
 def main() -> None:
     """Retrieve and display filtered user data from the database."""
+    parser = argparse.ArgumentParser(description=main.__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000,
+                        help="rows fetched per round trip")
+    parser.add_argument("--where", help="SQL condition filtering users")
+    parser.add_argument("--limit", type=int,
+                        help="maximum number of rows to export")
+    args = parser.parse_args()
+
     logger = get_logger()
     db = get_db()
-    cursor = db.cursor(dictionary=True)
-    cursor.execute("SELECT * FROM users;")
-
-    for row in cursor:
-        message = "; ".join(f"{key}={value}" for key, value in row.items())
-        logger.info(message)
-
-    cursor.close()
-    db.close()
+    try:
+        export_users(db, logger, args.batch_size, args.where, args.limit)
+    finally:
+        db.close()
 
 
 if __name__ == "__main__":
@@ -3,16 +3,97 @@
 BasicAuth module for Basic Authentication implementation
 """
 import base64
+import hashlib
+import hmac
+import os
+import threading
+import time
+from collections import OrderedDict
 from typing import TypeVar
 from api.v1.auth.auth import Auth
 from models.user import User
 
 
+class CredentialCache:
+    """
+    Short-lived cache of verified Authorization headers
+
+    Entries are keyed by an HMAC of the raw header under a per-process
+    random key, so credentials are never kept in clear. An entry maps to
+    the user id and the password hash it was verified against; it is
+    dropped once the user is removed or the password hash changes.
+    """
+
+    def __init__(self, max_size: int = 1024, ttl: float = 30):
+        """
+        Initialize an empty cache holding up to max_size entries for
+        ttl seconds each
+        """
+        self.max_size = max_size
+        self.ttl = ttl
+        self._key = os.urandom(32)
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _digest(self, authorization_header: str) -> bytes:
+        """
+        Keyed hash of a raw Authorization header
+        """
+        return hmac.new(self._key, authorization_header.encode(),
+                        hashlib.sha256).digest()
+
+    def get(self, authorization_header: str) -> TypeVar('User'):
+        """
+        Returns the user verified for this header, or None
+        """
+        if self.max_size <= 0:
+            return None
+        digest = self._digest(authorization_header)
+        with self._lock:
+            entry = self._entries.get(digest)
+        if entry is None:
+            return None
+        user_id, password, expires_at = entry
+        user = User.get(user_id)
+        if expires_at < time.monotonic() or user is None \
+                or user.password != password:
+            with self._lock:
+                self._entries.pop(digest, None)
+            return None
+        return user
+
+    def put(self, authorization_header: str, user: TypeVar('User')):
+        """
+        Records a header successfully verified for user
+        """
+        if self.max_size <= 0:
+            return
+        digest = self._digest(authorization_header)
+        with self._lock:
+            self._entries[digest] = (user.id, user.password,
+                                     time.monotonic() + self.ttl)
+            self._entries.move_to_end(digest)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+
 class BasicAuth(Auth):
     """
     Basic Authentication class that inherits from Auth
+
+    Verified headers are cached for BASIC_AUTH_CACHE_TTL seconds (up to
+    BASIC_AUTH_CACHE_SIZE entries, 0 to disable) so repeat requests skip
+    decoding, the user search and password hashing.
     """
 
+    def __init__(self):
+        """
+        Initialize BasicAuth with its credential cache
+        """
+        self.credential_cache = CredentialCache(
+            int(os.getenv('BASIC_AUTH_CACHE_SIZE', 1024)),
+            float(os.getenv('BASIC_AUTH_CACHE_TTL', 30)))
+
     def extract_base64_authorization_header(self,
                                             authorization_header: str) -> str:
         """
@@ -81,11 +162,18 @@ class BasicAuth(Auth):
 
     def current_user(self, request=None) -> TypeVar('User'):
         """
-        Retrieves the User instance for a request
+        Retrieves the User instance for a request, reusing the one
+        already resolved for it by before_request
         """
+        user = getattr(request, 'current_user', None)
+        if user is not None:
+            return user
         auth_header = self.authorization_header(request)
         if auth_header is None:
             return None
+        user = self.credential_cache.get(auth_header)
+        if user is not None:
+            return user
         base64_credentials = self.extract_base64_authorization_header(
             auth_header)
         if base64_credentials is None:
@@ -97,4 +185,7 @@ class BasicAuth(Auth):
         email, password = self.extract_user_credentials(decoded_credentials)
         if email is None or password is None:
             return None
-        return self.user_object_from_credentials(email, password)
+        user = self.user_object_from_credentials(email, password)
+        if user is not None:
+            self.credential_cache.put(auth_header, user)
+        return user
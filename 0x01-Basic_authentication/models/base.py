@@ -1,21 +1,514 @@
 #!/usr/bin/env python3
 """ Base module
 """
-from datetime import datetime
-from typing import TypeVar, List, Iterable
-from os import path
+from datetime import datetime, timedelta
+from typing import TypeVar, List, Iterable, Iterator, Tuple
+from os import getenv, path
+import atexit
+import heapq
 import json
+import logging
+import os
+import re
+import sys
+import threading
+import time
 import uuid
+from models.lazy_objects import LazyObjects, iter_objects, scan_objects
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def _env_choice(name: str, default: str, choices: Tuple[str, ...]) -> str:
+    """ Read an environment variable that must hold one of `choices`
+    """
+    value = getenv(name, default)
+    if value not in choices:
+        raise ValueError("{} must be one of {}, not {!r}".format(
+            name, ", ".join(choice or "''" for choice in choices), value))
+    return value
 
 
 TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_ISO_FORMAT = "%Y-%m-%dT%H:%M:%S"
+_ISO_PATTERN = re.compile(r'\d{4}-\d\d-\d\dT\d\d:\d\d:\d\d', re.ASCII)
 DATA = {}
+STORAGE = _env_choice('MODELS_STORAGE', 'json',
+                      ('json', 'journal', 'write_behind', 'sqlite'))
+JOURNAL_COMPACT_INTERVAL = float(getenv('MODELS_JOURNAL_COMPACT_INTERVAL', 60))
+FLUSH_INTERVAL_MS = float(getenv('MODELS_FLUSH_INTERVAL_MS', 100))
+FLUSH_MAX_CHANGES = int(getenv('MODELS_FLUSH_MAX_CHANGES', 100))
+FSYNC = _env_choice('MODELS_FSYNC', 'never', ('never', 'interval', 'always'))
+FSYNC_INTERVAL = float(getenv('MODELS_FSYNC_INTERVAL', 1))
+COMPACT = _env_choice('MODELS_COMPACT', '', ('', 'slots', 'epoch'))
+LAZY_LOAD = _env_choice('MODELS_LOAD', 'eager', ('eager', 'lazy')) == 'lazy'
+SQLITE_PATH = getenv('MODELS_SQLITE_PATH', '.db_models.sqlite3')
+INDEXES = {}
+INDEXED_VALUES = {}
+FILE_STATES = {}
+
+
+_PLANS = {}
+_TIMESTAMP_MEMO = '_timestamps'
+_logger = logging.getLogger(__name__)
+
+
+def _is_iso(value: str) -> bool:
+    """ Tell if a string is exactly what TIMESTAMP_FORMAT outputs when
+    that format is ISO 8601 (YYYY-MM-DDTHH:MM:SS, ASCII digits), so
+    forms only fromisoformat accepts (week dates, offsets...) are
+    left to strptime
+    """
+    return TIMESTAMP_FORMAT == _ISO_FORMAT and len(value) == 19 \
+        and _ISO_PATTERN.match(value) is not None
+
+
+def _parse_timestamp(value: str) -> datetime:
+    """ Parse a TIMESTAMP_FORMAT string, through the much faster
+    datetime.fromisoformat when the string is in ISO form
+    """
+    if _is_iso(value):
+        try:
+            result = datetime.fromisoformat(value)
+            if result.tzinfo is None:
+                return result
+        except ValueError:
+            pass
+    return datetime.strptime(value, TIMESTAMP_FORMAT)
+
+
+def _format_timestamp(value: datetime) -> str:
+    """ Format a datetime with TIMESTAMP_FORMAT, through isoformat when
+    both give the same result
+    """
+    if TIMESTAMP_FORMAT == _ISO_FORMAT and value.year >= 1000:
+        return value.replace(microsecond=0, tzinfo=None).isoformat()
+    return value.strftime(TIMESTAMP_FORMAT)
+
+
+def _field_plan(cls: type, keys: tuple, for_serialization: bool) -> tuple:
+    """ Keys of an object's __dict__ that to_json outputs, computed once
+    per class and attribute layout
+    """
+    plan_key = (cls, keys, for_serialization)
+    plan = _PLANS.get(plan_key)
+    if plan is None:
+        plan = tuple(key for key in keys if key != _TIMESTAMP_MEMO and
+                     key not in cls.transient_attributes and
+                     (for_serialization or key[0] != '_'))
+        _PLANS[plan_key] = plan
+    return plan
+
+
+def _slot_plan(cls: type) -> tuple:
+    """ Attribute names to_json outputs for a compact class: its slots
+    in definition order, base class first
+    """
+    plan = _PLANS.get(cls)
+    if plan is None:
+        plan = []
+        for klass in reversed(cls.__mro__):
+            for name in klass.__dict__.get('__slots__', ()):
+                if name in cls.transient_attributes:
+                    continue
+                if name in ('_created_at', '_updated_at'):
+                    name = name[1:]
+                plan.append(name)
+        plan = _PLANS[cls] = tuple(plan)
+    return plan
+
+
+_EPOCH = datetime(1970, 1, 1)
+_SECOND = timedelta(seconds=1)
+
+
+def _epoch_property(name: str) -> property:
+    """ datetime attribute stored as whole seconds since the epoch in
+    the slot _<name>
+    """
+    slot = '_' + name
+
+    def getter(self) -> datetime:
+        """ Read the timestamp """
+        return _EPOCH + timedelta(seconds=getattr(self, slot))
+
+    def setter(self, value: datetime):
+        """ Store the timestamp, truncated to the second """
+        setattr(self, slot, (value - _EPOCH) // _SECOND)
+
+    return property(getter, setter, doc="{} (UTC)".format(name))
+
+
+def _file_state(s_class: str) -> tuple:
+    """ Identity of the files backing a class: inode, size and mtime of
+    the snapshot and of the journal
+    """
+    state = []
+    for ext in ("json", "journal"):
+        try:
+            st = os.stat(".db_{}.{}".format(s_class, ext))
+            state.append((st.st_ino, st.st_size, st.st_mtime_ns))
+        except OSError:
+            state.append(None)
+    return tuple(state)
+
+
+def _index_add(obj: TypeVar('Base')):
+    """ Add an object to the indexes of its class
+    """
+    _index_add_values(obj.__class__.__name__, obj.id, obj, {
+        attr: getattr(obj, attr, None) for attr in obj.indexed_attributes})
+
+
+def _index_add_values(s_class: str, obj_id: str, obj: TypeVar('Base'),
+                      attrs: dict):
+    """ Add an object to the indexes of its class given the values of
+    its indexed attributes; `obj` is None for an object not built yet
+    """
+    indexes = INDEXES.setdefault(s_class, {})
+    values = {}
+    for attr, value in attrs.items():
+        try:
+            indexes.setdefault(attr, {}).setdefault(value, {})[obj_id] = obj
+        except TypeError:
+            continue
+        values[attr] = value
+    INDEXED_VALUES.setdefault(s_class, {})[obj_id] = values
+
+
+def _index_remove(obj: TypeVar('Base')):
+    """ Remove an object from the indexes of its class
+    """
+    s_class = obj.__class__.__name__
+    values = INDEXED_VALUES.get(s_class, {}).pop(obj.id, None)
+    if values is None:
+        return
+    indexes = INDEXES[s_class]
+    for attr, value in values.items():
+        bucket = indexes[attr][value]
+        bucket.pop(obj.id, None)
+        if len(bucket) == 0:
+            del indexes[attr][value]
+
+
+def _index_update(obj: TypeVar('Base')):
+    """ Re-index an object whose indexed attributes may have changed
+    """
+    s_class = obj.__class__.__name__
+    values = INDEXED_VALUES.get(s_class, {}).get(obj.id)
+    if values is not None and all(
+            getattr(obj, attr, None) == values.get(attr)
+            for attr in obj.indexed_attributes):
+        return
+    _index_remove(obj)
+    _index_add(obj)
+
+
+_data_lock = threading.RLock()
+_class_locks = {}
+_class_locks_guard = threading.Lock()
+
+
+class _ClassLock:
+    """ Reentrant lock serializing the file writers of one class: a
+    thread lock within the process, plus an exclusive fcntl.flock on
+    .db_<Class>.lock against the other processes sharing the files
+    """
+
+    def __init__(self, s_class: str):
+        """ Initialize the lock of a class
+        """
+        self.path = ".db_{}.lock".format(s_class)
+        self._lock = threading.RLock()
+        self._depth = 0
+        self._file = None
+
+    def __enter__(self):
+        """ Acquire the lock, taking the file lock on the outermost entry
+        """
+        self._lock.acquire()
+        if self._depth == 0 and fcntl is not None:
+            try:
+                self._file = open(self.path, 'a')
+                fcntl.flock(self._file.fileno(), fcntl.LOCK_EX)
+            except BaseException:
+                if self._file is not None:
+                    self._file.close()
+                    self._file = None
+                self._lock.release()
+                raise
+        self._depth += 1
+        return self
+
+    def __exit__(self, *exc_info):
+        """ Release the lock; closing the lock file drops the file lock
+        """
+        self._depth -= 1
+        if self._depth == 0 and self._file is not None:
+            self._file.close()
+            self._file = None
+        self._lock.release()
+
+
+def _class_lock(s_class: str) -> _ClassLock:
+    """ Return the writer lock of a class, creating it once
+    """
+    lock = _class_locks.get(s_class)
+    if lock is None:
+        with _class_locks_guard:
+            lock = _class_locks.setdefault(s_class, _ClassLock(s_class))
+    return lock
+
+
+_stores = {}
+
+
+def _store(cls: type):
+    """ Return the SQLiteStore of a class, creating it once
+    """
+    store = _stores.get(cls)
+    if store is None:
+        from models.sqlite_store import SQLiteStore
+        synchronous = 'FULL' if FSYNC == 'always' else 'NORMAL'
+        created = SQLiteStore(cls, SQLITE_PATH, synchronous)
+        store = _stores.setdefault(cls, created)
+        if store is created:
+            atexit.register(store.close)
+    return store
+
+
+_journal_lock = threading.Lock()
+_journal_dirty = set()
+_compactor = None
+
+
+def _compact_loop():
+    """ Periodically fold the journals written since the last pass; a
+    class whose compaction fails is logged and retried on the next pass
+    """
+    while True:
+        time.sleep(JOURNAL_COMPACT_INTERVAL)
+        for cls in list(_journal_dirty):
+            try:
+                cls.compact()
+            except Exception:
+                _logger.exception("Compaction of %s failed", cls.__name__)
+
+
+def _start_compactor():
+    """ Start the background compaction thread once
+    """
+    global _compactor
+    if _compactor is None:
+        _compactor = threading.Thread(target=_compact_loop, daemon=True,
+                                      name="journal-compactor")
+        _compactor.start()
+
+
+_fsync_pending = set()
+_fsync_lock = threading.Lock()
+_fsyncer = None
+
+
+def _sync(f, final_path: str = None):
+    """ Apply the MODELS_FSYNC policy to an open file: fsync it now
+    (always), queue it for the next periodic fsync (interval) or leave
+    it to the OS (never). A file about to be renamed is queued under
+    final_path, the name it will have once the fsync runs.
+    """
+    global _fsyncer
+    if FSYNC == 'never':
+        return
+    f.flush()
+    if FSYNC != 'interval':
+        os.fsync(f.fileno())
+        return
+    with _fsync_lock:
+        _fsync_pending.add(path.abspath(final_path or f.name))
+        if _fsyncer is None:
+            _fsyncer = threading.Thread(target=_fsync_loop, daemon=True,
+                                        name="interval-fsync")
+            _fsyncer.start()
+
+
+def _fsync_loop():
+    """ Every FSYNC_INTERVAL seconds, fsync the files written since the
+    last pass
+    """
+    while True:
+        time.sleep(FSYNC_INTERVAL)
+        with _fsync_lock:
+            paths = list(_fsync_pending)
+            _fsync_pending.clear()
+        for file_path in paths:
+            try:
+                fd = os.open(file_path, os.O_RDONLY)
+            except FileNotFoundError:
+                continue
+            except OSError:
+                _logger.exception("Cannot open %s to fsync it", file_path)
+                continue
+            try:
+                os.fsync(fd)
+            except OSError:
+                _logger.exception("fsync of %s failed", file_path)
+            finally:
+                os.close(fd)
+
+
+def _log_load(s_class: str, start: float):
+    """ Log how long loading a class took, how many of its objects were
+    built and the peak resident memory of the process so far
+    """
+    if not _logger.isEnabledFor(logging.INFO):
+        return
+    elapsed = time.perf_counter() - start
+    objs = DATA[s_class]
+    if isinstance(objs, LazyObjects):
+        built = "{} built".format(objs.materialized())
+    else:
+        built = "all built"
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != 'darwin':
+            peak *= 1024
+        rss = "{:.1f} MiB".format(peak / 2 ** 20)
+    else:
+        rss = "unknown"
+    _logger.info("Loaded %d %s objects in %.1f ms (%s), peak RSS %s",
+                 len(objs), s_class, elapsed * 1000, built, rss)
+
+
+_dirty = {}
+_flushing = set()
+_dirty_cond = threading.Condition()
+_flush_lock = threading.Lock()
+_flusher = None
+
+
+def _mark_dirty(cls):
+    """ Record a pending change of a class for the write-behind flusher
+    """
+    global _flusher
+    with _dirty_cond:
+        _dirty[cls] = _dirty.get(cls, 0) + 1
+        if _flusher is None:
+            _flusher = threading.Thread(target=_flush_loop, daemon=True,
+                                        name="write-behind-flusher")
+            _flusher.start()
+            atexit.register(flush)
+        _dirty_cond.notify()
+
+
+def _take_dirty() -> list:
+    """ Move the classes with pending changes from _dirty to _flushing;
+    the caller holds _dirty_cond
+    """
+    classes = list(_dirty)
+    _dirty.clear()
+    _flushing.update(classes)
+    return classes
+
+
+def _write_dirty(classes: list):
+    """ Save the given classes to file, one writer at a time
+    """
+    with _flush_lock:
+        for cls in classes:
+            try:
+                cls.save_to_file()
+            finally:
+                with _dirty_cond:
+                    _flushing.discard(cls)
+
+
+def _has_pending(cls) -> bool:
+    """ Whether a class has write-behind changes not saved to file yet
+    """
+    with _dirty_cond:
+        return cls in _dirty or cls in _flushing
+
+
+def _flush_loop():
+    """ Coalesce pending changes: write once FLUSH_MAX_CHANGES have
+    accumulated or FLUSH_INTERVAL_MS after the first one
+    """
+    while True:
+        with _dirty_cond:
+            while not _dirty:
+                _dirty_cond.wait()
+            deadline = time.monotonic() + FLUSH_INTERVAL_MS / 1000
+            while sum(_dirty.values()) < FLUSH_MAX_CHANGES:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                _dirty_cond.wait(remaining)
+            classes = _take_dirty()
+        _write_dirty(classes)
+
+
+def flush():
+    """ Write every class with pending write-behind changes now
+    """
+    with _dirty_cond:
+        classes = _take_dirty()
+    _write_dirty(classes)
 
 
 class Base():
     """ Base class
+
+    Subclasses list in `indexed_attributes` the attributes to keep in a
+    hash index; `search` uses it when a query hits one of them.
+    Attributes in `transient_attributes` are never output by to_json.
+
+    With MODELS_COMPACT set to `slots`, models store their attributes in
+    __slots__ instead of a __dict__ and only the attributes they declare
+    can be set; string values of `interned_attributes` loaded from file
+    are interned. `epoch` does the same and also stores created_at and
+    updated_at as whole seconds since the epoch.
+
+    With MODELS_LOAD=lazy, load_from_file only records where each
+    object sits in the file and the values of its indexed attributes;
+    objects are built on first access.
+
+    DATA and the indexes are mutated under a process-wide lock that
+    readers hold only to snapshot them. File writes of a class are
+    serialized across threads and processes by its _ClassLock; in json
+    mode a writer first reloads changes made by other processes, so
+    several workers can share the same files.
+
+    With MODELS_STORAGE=sqlite, objects live in a table per class of the
+    SQLite database MODELS_SQLITE_PATH instead of DATA: get, search,
+    count, save and remove query it, load_from_file imports the JSON
+    file into an empty table and save_to_file exports the table.
+
+    MODELS_FSYNC trades durability for write latency. The default,
+    `never`, leaves flushing to the OS: a killed process loses nothing
+    written, but a power loss or kernel crash can lose the last writes
+    and, on some filesystems, leave a renamed snapshot empty. `interval`
+    fsyncs written files every MODELS_FSYNC_INTERVAL seconds, bounding
+    that loss, and `always` fsyncs every snapshot before its rename and
+    every journal append before returning.
     """
 
+    indexed_attributes: Tuple[str, ...] = ()
+    interned_attributes: Tuple[str, ...] = ()
+    transient_attributes: Tuple[str, ...] = ()
+
+    if COMPACT == 'epoch':
+        __slots__ = ('id', '_created_at', '_updated_at')
+        created_at = _epoch_property('created_at')
+        updated_at = _epoch_property('updated_at')
+    elif COMPACT:
+        __slots__ = ('id', 'created_at', 'updated_at')
+
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a Base instance
         """
@@ -23,17 +516,22 @@ class Base():
         if DATA.get(s_class) is None:
             DATA[s_class] = {}
 
-        self.id = kwargs.get('id', str(uuid.uuid4()))
-        if kwargs.get('created_at') is not None:
-            self.created_at = datetime.strptime(kwargs.get('created_at'),
-                                                TIMESTAMP_FORMAT)
-        else:
-            self.created_at = datetime.utcnow()
-        if kwargs.get('updated_at') is not None:
-            self.updated_at = datetime.strptime(kwargs.get('updated_at'),
-                                                TIMESTAMP_FORMAT)
+        if 'id' in kwargs:
+            self.id = kwargs['id']
         else:
-            self.updated_at = datetime.utcnow()
+            self.id = str(uuid.uuid4())
+        memo = {}
+        for key in ('created_at', 'updated_at'):
+            text = kwargs.get(key)
+            if text is not None:
+                value = _parse_timestamp(text)
+                if _is_iso(text):
+                    memo[key] = (value, text)
+            else:
+                value = datetime.utcnow()
+            setattr(self, key, value)
+        if not COMPACT:
+            self.__dict__[_TIMESTAMP_MEMO] = memo
 
     def __eq__(self, other: TypeVar('Base')) -> bool:
         """ Equality
@@ -44,67 +542,371 @@ class Base():
             return False
         return (self.id == other.id)
 
-    def to_json(self, for_serialization: bool = False) -> dict:
-        """ Convert the object a JSON dictionary
+    def to_json(self, for_serialization: bool = False,
+                fields: Iterable[str] = None) -> dict:
+        """ Convert the object a JSON dictionary, restricted to `fields`
+        when given
+
+        Formatted timestamps are memoized per object until the
+        attribute is assigned a new datetime.
         """
+        if COMPACT:
+            return self._compact_json(for_serialization, fields)
+        attrs = self.__dict__
+        if fields is None:
+            keys = _field_plan(self.__class__, tuple(attrs),
+                               for_serialization)
+        else:
+            keys = [key for key in fields if key in attrs and
+                    key != _TIMESTAMP_MEMO and
+                    key not in self.transient_attributes and
+                    (for_serialization or key[0] != '_')]
+        memo = attrs.get(_TIMESTAMP_MEMO)
+        if memo is None:
+            memo = attrs[_TIMESTAMP_MEMO] = {}
         result = {}
-        for key, value in self.__dict__.items():
-            if not for_serialization and key[0] == '_':
-                continue
+        for key in keys:
+            value = attrs[key]
             if type(value) is datetime:
-                result[key] = value.strftime(TIMESTAMP_FORMAT)
+                cached = memo.get(key)
+                if cached is None or cached[0] is not value:
+                    cached = memo[key] = (value, _format_timestamp(value))
+                result[key] = cached[1]
             else:
                 result[key] = value
         return result
 
+    def _compact_json(self, for_serialization: bool,
+                      fields: Iterable[str] = None) -> dict:
+        """ to_json of a compact object, skipping unset slots
+        """
+        keys = _slot_plan(self.__class__)
+        if fields is not None:
+            keys = [key for key in fields if key in keys]
+        result = {}
+        for key in keys:
+            if not for_serialization and key[0] == '_':
+                continue
+            try:
+                value = getattr(self, key)
+            except AttributeError:
+                continue
+            if type(value) is datetime:
+                value = _format_timestamp(value)
+            result[key] = value
+        return result
+
+    @classmethod
+    def _intern(cls, obj_json: dict, obj_id: str = None) -> dict:
+        """ Share repeated strings of a loaded object: its id with the
+        key it is stored under, and interned_attributes through
+        sys.intern
+        """
+        if obj_id is not None and obj_json.get('id') == obj_id:
+            obj_json['id'] = obj_id
+        for attr in cls.interned_attributes:
+            value = obj_json.get(attr)
+            if type(value) is str:
+                obj_json[attr] = sys.intern(value)
+        return obj_json
+
     @classmethod
     def load_from_file(cls):
         """ Load all objects from file
+
+        The file is parsed entry by entry and each object is built as
+        soon as its entry is read, so the whole text and decoded
+        dictionary are never held at once. The load time and memory
+        are logged at INFO level.
         """
         s_class = cls.__name__
         file_path = ".db_{}.json".format(s_class)
-        DATA[s_class] = {}
-        if not path.exists(file_path):
+        objs = {}
+        if STORAGE == 'sqlite':
+            return cls.import_to_sqlite()
+
+        start = time.perf_counter()
+        if LAZY_LOAD:
+            cls.load_lazily()
+            _log_load(s_class, start)
             return
 
+        with _class_lock(s_class):
+            state = _file_state(s_class)
+            if path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    for obj_id, obj_json in iter_objects(f):
+                        objs[obj_id] = cls._from_json(obj_id, obj_json)
+            cls.replay_journal(objs)
+
+        with _data_lock:
+            DATA[s_class] = objs
+            INDEXES[s_class] = {}
+            INDEXED_VALUES[s_class] = {}
+            for obj in objs.values():
+                _index_add(obj)
+            FILE_STATES[s_class] = state
+        _log_load(s_class, start)
+
+    @classmethod
+    def _from_json(cls, obj_id: str, obj_json: dict) -> TypeVar('Base'):
+        """ Build an object loaded from file
+        """
+        if COMPACT:
+            obj_json = cls._intern(obj_json, obj_id)
+        return cls(**obj_json)
+
+    @classmethod
+    def load_lazily(cls):
+        """ Load the file as a LazyObjects mapping: the text is kept and
+        scanned once for the offsets and indexed values of each object
+        """
+        s_class = cls.__name__
+        file_path = ".db_{}.json".format(s_class)
+        values = {}
+        with _class_lock(s_class):
+            state = _file_state(s_class)
+            text = '{}'
+            if path.exists(file_path):
+                with open(file_path, 'r') as f:
+                    text = f.read()
+            objs = LazyObjects(text, cls._from_json)
+            for obj_id, start, end, attrs in scan_objects(
+                    text, cls.indexed_attributes):
+                objs.add_offsets(obj_id, start, end)
+                values[obj_id] = attrs
+            cls.replay_journal(objs)
+
+        with _data_lock:
+            DATA[s_class] = objs
+            INDEXES[s_class] = {}
+            INDEXED_VALUES[s_class] = {}
+            for obj_id, entry in objs.raw_items():
+                if type(entry) is tuple:
+                    _index_add_values(s_class, obj_id, None,
+                                      values[obj_id])
+                else:
+                    _index_add(entry)
+            FILE_STATES[s_class] = state
+
+    @classmethod
+    def import_to_sqlite(cls):
+        """ Import the JSON file of the class into its SQLite table when
+        the table is empty
+        """
+        DATA.setdefault(cls.__name__, {})
+        file_path = ".db_{}.json".format(cls.__name__)
+        store = _store(cls)
+        if store.count() > 0 or not path.exists(file_path):
+            return
         with open(file_path, 'r') as f:
-            objs_json = json.load(f)
-            for obj_id, obj_json in objs_json.items():
-                DATA[s_class][obj_id] = cls(**obj_json)
+            store.save_many(cls(**obj_json)
+                            for _, obj_json in iter_objects(f))
+
+    @classmethod
+    def reload_if_changed(cls) -> bool:
+        """ Reload from file only if another writer changed it since this
+        process last loaded or wrote it
+
+        A changed file is checked again under the class lock, so a save
+        of this process is never mistaken for another writer's. With
+        MODELS_STORAGE=write_behind, a class whose changes are not saved
+        yet is not reloaded: its objects in memory are the newest.
+        """
+        if STORAGE == 'sqlite':
+            return False
+        s_class = cls.__name__
+        if _file_state(s_class) == FILE_STATES.get(s_class):
+            return False
+        with _class_lock(s_class):
+            if _file_state(s_class) == FILE_STATES.get(s_class):
+                return False
+            if STORAGE == 'write_behind' and _has_pending(cls):
+                return False
+            cls.load_from_file()
+        return True
+
+    @classmethod
+    def invalidate(cls):
+        """ Force the next reload_if_changed to reload from file
+        """
+        FILE_STATES.pop(cls.__name__, None)
 
     @classmethod
     def save_to_file(cls):
         """ Save all objects to file
+
+        The snapshot is written to a temporary file, synced as
+        MODELS_FSYNC says and renamed over the previous one, so readers
+        and a crash of the process never see a partial file.
         """
         s_class = cls.__name__
         file_path = ".db_{}.json".format(s_class)
-        objs_json = {}
-        for obj_id, obj in DATA[s_class].items():
-            objs_json[obj_id] = obj.to_json(True)
+        with _class_lock(s_class):
+            if STORAGE == 'sqlite':
+                objs_json = _store(cls).export()
+            else:
+                with _data_lock:
+                    objs = DATA[s_class]
+                    if isinstance(objs, LazyObjects):
+                        items = objs.raw_items()
+                    else:
+                        items = list(objs.items())
+                objs_json = {}
+                for obj_id, obj in items:
+                    if type(obj) is tuple:
+                        objs_json[obj_id] = objs.decode(obj)
+                    else:
+                        objs_json[obj_id] = obj.to_json(True)
 
-        with open(file_path, 'w') as f:
-            json.dump(objs_json, f)
+            tmp_path = "{}.{}.tmp".format(file_path, os.getpid())
+            with open(tmp_path, 'w') as f:
+                f.write(json.dumps(objs_json))
+                _sync(f, file_path)
+            os.replace(tmp_path, file_path)
+            FILE_STATES[s_class] = _file_state(s_class)
+
+    @classmethod
+    def append_to_journal(cls, op: str, obj: TypeVar('Base')):
+        """ Append one mutation to the JSON-lines journal of the class
+        """
+        record = {"op": op, "id": obj.id}
+        if op == "save":
+            record["obj"] = obj.to_json(True)
+        line = json.dumps(record) + "\n"
+        s_class = cls.__name__
+        with _class_lock(s_class), _journal_lock:
+            unchanged = _file_state(s_class) == FILE_STATES.get(s_class)
+            with open(".db_{}.journal".format(s_class), 'a') as f:
+                f.write(line)
+                _sync(f)
+            if unchanged:
+                FILE_STATES[s_class] = _file_state(s_class)
+            _journal_dirty.add(cls)
+        _start_compactor()
+
+    @classmethod
+    def replay_journal(cls, objs: dict = None):
+        """ Apply the journal of the class on top of the loaded snapshot
+        `objs`, by default the objects in DATA
+        """
+        s_class = cls.__name__
+        if objs is None:
+            objs = DATA[s_class]
+        journal_path = ".db_{}.journal".format(s_class)
+        if not path.exists(journal_path):
+            return
+
+        with open(journal_path, 'r') as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                if record["op"] == "save":
+                    obj_json = record["obj"]
+                    if COMPACT:
+                        obj_json = cls._intern(obj_json)
+                    objs[record["id"]] = cls(**obj_json)
+                else:
+                    objs.pop(record["id"], None)
+
+    @classmethod
+    def compact(cls):
+        """ Fold the journal into a new snapshot and truncate it
+
+        Journal records hold full objects, so replaying a journal that
+        was already folded into the snapshot is harmless. Records
+        appended by other processes are loaded first.
+        """
+        with _class_lock(cls.__name__):
+            cls.reload_if_changed()
+            with _journal_lock:
+                cls.save_to_file()
+                open(".db_{}.journal".format(cls.__name__), 'w').close()
+                FILE_STATES[cls.__name__] = _file_state(cls.__name__)
+                _journal_dirty.discard(cls)
+
+    @classmethod
+    def _apply(cls, op: str, obj: TypeVar('Base')) -> bool:
+        """ Apply a save or remove to DATA and the indexes; return False
+        for the removal of an absent object
+        """
+        with _data_lock:
+            objs = DATA[cls.__name__]
+            current = objs.get(obj.id)
+            if current is not None and current is not obj:
+                _index_remove(current)
+            if op == "save":
+                objs[obj.id] = obj
+                _index_update(obj)
+            elif current is None:
+                return False
+            else:
+                del objs[obj.id]
+                _index_remove(obj)
+        return True
+
+    @classmethod
+    def persist(cls, op: str, *objs: TypeVar('Base')):
+        """ Persist saves or removes according to MODELS_STORAGE
+
+        The changes are applied again under the class lock, after
+        reloading the changes other processes wrote in json mode.
+        """
+        if STORAGE == 'write_behind':
+            _mark_dirty(cls)
+            return
+        if STORAGE == 'sqlite':
+            if op == "save" and len(objs) == 1:
+                _store(cls).save(objs[0])
+            elif op == "save":
+                _store(cls).save_many(objs)
+            else:
+                _store(cls).remove(objs)
+            return
+        with _class_lock(cls.__name__):
+            if STORAGE == 'journal':
+                for obj in objs:
+                    cls.append_to_journal(op, obj)
+            else:
+                cls.reload_if_changed()
+            for obj in objs:
+                cls._apply(op, obj)
+            if STORAGE != 'journal':
+                cls.save_to_file()
 
     def save(self):
         """ Save current object
         """
-        s_class = self.__class__.__name__
         self.updated_at = datetime.utcnow()
-        DATA[s_class][self.id] = self
-        self.__class__.save_to_file()
+        if STORAGE != 'sqlite':
+            self.__class__._apply("save", self)
+        self.__class__.persist("save", self)
 
     def remove(self):
         """ Remove object
         """
-        s_class = self.__class__.__name__
-        if DATA[s_class].get(self.id) is not None:
-            del DATA[s_class][self.id]
-            self.__class__.save_to_file()
+        if STORAGE == 'sqlite' or self.__class__._apply("remove", self):
+            self.__class__.persist("remove", self)
+
+    @classmethod
+    def remove_many(cls, objs: Iterable[TypeVar('Base')]) -> int:
+        """ Remove several objects, persisting the class once
+        """
+        if STORAGE == 'sqlite':
+            return _store(cls).remove(objs)
+        removed = [obj for obj in objs if cls._apply("remove", obj)]
+        if removed:
+            cls.persist("remove", *removed)
+        return len(removed)
 
     @classmethod
     def count(cls) -> int:
         """ Count all objects
         """
+        if STORAGE == 'sqlite':
+            return _store(cls).count()
         s_class = cls.__name__
         return len(DATA[s_class].keys())
 
@@ -114,16 +916,65 @@ class Base():
         """
         return cls.search()
 
+    @classmethod
+    def iter_all(cls, batch_size: int = 1000) -> Iterator[TypeVar('Base')]:
+        """ Yield all objects in the order of all(), from a snapshot of
+        their IDs in json mode and batch_size rows at a time with
+        sqlite, so the whole list is never built
+
+        In lazy mode, objects not built yet are built for the caller
+        only and not kept in DATA.
+        """
+        if STORAGE == 'sqlite':
+            yield from _store(cls).iter_all(batch_size)
+            return
+        with _data_lock:
+            objs = DATA[cls.__name__]
+            if isinstance(objs, LazyObjects):
+                items = objs.raw_items()
+            else:
+                items = list(objs.items())
+        for obj_id, obj in items:
+            if type(obj) is tuple:
+                obj = cls._from_json(obj_id, objs.decode(obj))
+            yield obj
+
+    @classmethod
+    def page(cls, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Return objects ordered by ID, starting after the ID `after`
+        and holding at most `limit` of them
+        """
+        if STORAGE == 'sqlite':
+            return _store(cls).page(after, limit)
+        s_class = cls.__name__
+        with _data_lock:
+            objs = DATA[s_class]
+            ids = list(objs)
+        if after is not None:
+            ids = [obj_id for obj_id in ids if obj_id > after]
+        if limit is None:
+            ids.sort()
+        else:
+            ids = heapq.nsmallest(limit, ids)
+        page = [objs.get(obj_id) for obj_id in ids]
+        return [obj for obj in page if obj is not None]
+
     @classmethod
     def get(cls, id: str) -> TypeVar('Base'):
         """ Return one object by ID
         """
+        if STORAGE == 'sqlite':
+            return _store(cls).get(id)
         s_class = cls.__name__
         return DATA[s_class].get(id)
 
     @classmethod
     def search(cls, attributes: dict = {}) -> List[TypeVar('Base')]:
         """ Search all objects with matching attributes
+
+        In lazy mode only the candidate IDs are taken under the data
+        lock; their objects are built after releasing it.
         """
         s_class = cls.__name__
         def _search(obj):
@@ -133,5 +984,28 @@ class Base():
                 if (getattr(obj, k) != v):
                     return False
             return True
-        
-        return list(filter(_search, DATA[s_class].values()))
+
+        if STORAGE == 'sqlite':
+            return list(filter(_search, _store(cls).select(attributes)))
+        with _data_lock:
+            objs = DATA[s_class]
+            lazy = isinstance(objs, LazyObjects)
+            candidates = None
+            for k, v in attributes.items():
+                if k not in cls.indexed_attributes:
+                    continue
+                try:
+                    bucket = INDEXES[s_class][k].get(v, {})
+                except (KeyError, TypeError):
+                    continue
+                if lazy:
+                    candidates = list(bucket)
+                else:
+                    candidates = [objs[obj_id] for obj_id in bucket]
+                break
+            if candidates is None:
+                candidates = list(objs) if lazy else list(objs.values())
+        if lazy:
+            candidates = [obj for obj in map(objs.get, candidates)
+                          if obj is not None]
+        return list(filter(_search, candidates))
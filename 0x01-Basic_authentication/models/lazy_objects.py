@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+""" Lazy and incremental loading of model files
+"""
+from collections.abc import MutableMapping
+from json.decoder import JSONDecoder, scanstring
+from typing import Callable, Iterator, TextIO, Tuple
+import json
+import re
+import threading
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = JSONDecoder()
+
+
+def _open_mapping(text: str) -> int:
+    """ Index of the first key of the top-level mapping of a JSON text,
+    or -1 if the mapping is empty
+    """
+    skip = _WHITESPACE.match
+    idx = skip(text, 0).end()
+    if text[idx:idx + 1] != '{':
+        raise ValueError("Expecting '{{' at char {}".format(idx))
+    idx = skip(text, idx + 1).end()
+    if text[idx:idx + 1] == '}':
+        return -1
+    if text[idx:idx + 1] != '"':
+        raise ValueError("Expecting key at char {}".format(idx))
+    return idx
+
+
+def _next_entry(text: str, idx: int) -> tuple:
+    """ Parse the entry of the top-level mapping whose key starts at idx,
+    after optional whitespace, and return (id, object, start, end,
+    next), where text[start:end] is the object and next is the index of
+    the following key, or -1 after the last entry
+
+    The separators written by json.dumps (', ' and ': ') are matched
+    directly; any other whitespace goes through the slower regex.
+    """
+    skip = _WHITESPACE.match
+    if text[idx:idx + 1] != '"':
+        idx = skip(text, idx).end()
+        if text[idx:idx + 1] != '"':
+            raise ValueError("Expecting key at char {}".format(idx))
+    obj_id, idx = scanstring(text, idx + 1)
+    if text.startswith(': ', idx):
+        idx += 2
+    else:
+        idx = skip(text, idx).end()
+        if text[idx:idx + 1] != ':':
+            raise ValueError("Expecting ':' at char {}".format(idx))
+        idx = skip(text, idx + 1).end()
+    try:
+        obj_json, end = _decoder.scan_once(text, idx)
+    except StopIteration:
+        raise ValueError("Expecting value at char {}".format(idx))
+    if text.startswith(', "', end):
+        return obj_id, obj_json, idx, end, end + 2
+    following = skip(text, end).end()
+    if text[following:following + 1] == '}':
+        return obj_id, obj_json, idx, end, -1
+    if text[following:following + 1] != ',':
+        raise ValueError("Expecting ',' at char {}".format(following))
+    return obj_id, obj_json, idx, end, skip(text, following + 1).end()
+
+
+def scan_objects(text: str, attributes: Tuple[str, ...] = ()) -> Iterator:
+    """ Walk the top-level {id: object} mapping of a JSON text and yield
+    (id, start, end, values) per entry, where text[start:end] is the
+    object and values holds its listed attributes; anything but
+    whitespace after the mapping is rejected
+    """
+    idx = _open_mapping(text)
+    end = text.index('{') + 1
+    while idx >= 0:
+        obj_id, obj_json, start, end, idx = _next_entry(text, idx)
+        yield obj_id, start, end, {attr: obj_json.get(attr)
+                                   for attr in attributes}
+    if text[_WHITESPACE.match(text, end).end() + 1:].strip(' \t\n\r'):
+        raise ValueError("Extra data after the top-level mapping")
+
+
+def iter_objects(f: TextIO, chunk_size: int = 1 << 20,
+                 max_chunks: int = 64) -> Iterator:
+    """ Parse the top-level {id: object} mapping of a JSON file entry by
+    entry and yield (id, json_dict), reading chunk_size characters at a
+    time so only the current chunk is held besides the results
+
+    An entry that still does not parse once max_chunks chunks are
+    buffered for it is reported as invalid instead of reading the rest
+    of the file into memory; anything but whitespace after the mapping
+    is rejected, as json.load does.
+    """
+    buf = ''
+    idx = None
+    eof = False
+    while True:
+        try:
+            if idx is None:
+                idx = _open_mapping(buf)
+                end = buf.index('{') + 1
+            if idx < 0:
+                break
+            obj_id, obj_json, _, end, following = _next_entry(buf, idx)
+        except ValueError as e:
+            if eof:
+                raise
+            if len(buf) - (idx or 0) > max_chunks * chunk_size:
+                raise ValueError("No valid entry within {} chunks: {}".format(
+                    max_chunks, e)) from e
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            if idx is not None:
+                buf, idx = buf[idx:], 0
+            buf += chunk
+            continue
+        yield obj_id, obj_json
+        idx = following
+    rest = buf[_WHITESPACE.match(buf, end).end() + 1:]
+    while True:
+        if rest.strip(' \t\n\r'):
+            raise ValueError("Extra data after the top-level mapping")
+        if eof:
+            return
+        rest = f.read(chunk_size)
+        eof = not rest
+
+
+class LazyObjects(MutableMapping):
+    """ Mapping of ID to object over the text of a model file
+
+    Entries start as (start, end) offsets into the text and are built
+    with `factory(id, json_dict)` on first access; iteration keeps the
+    order of the file. Building an entry and replacing or removing one
+    are serialized by the mapping's own lock, so objects can be built
+    without holding the store's data lock.
+    """
+
+    def __init__(self, text: str, factory: Callable):
+        """ Initialize an empty mapping over `text`
+        """
+        self.text = text
+        self.factory = factory
+        self._entries = {}
+        self._lock = threading.Lock()
+
+    def add_offsets(self, obj_id: str, start: int, end: int):
+        """ Register an entry not materialized yet
+        """
+        self._entries[obj_id] = (start, end)
+
+    def decode(self, offsets: Tuple[int, int]) -> dict:
+        """ JSON dictionary of an entry not materialized yet
+        """
+        return json.loads(self.text[offsets[0]:offsets[1]])
+
+    def raw_items(self) -> list:
+        """ Snapshot of the entries: objects, or offsets for the entries
+        not materialized yet
+        """
+        return list(self._entries.items())
+
+    def materialized(self) -> int:
+        """ Number of entries already built
+        """
+        return sum(1 for entry in self._entries.values()
+                   if type(entry) is not tuple)
+
+    def __getitem__(self, obj_id: str):
+        """ Return an object, building it on first access
+        """
+        entry = self._entries[obj_id]
+        if type(entry) is not tuple:
+            return entry
+        with self._lock:
+            entry = self._entries[obj_id]
+            if type(entry) is tuple:
+                entry = self.factory(obj_id, self.decode(entry))
+                self._entries[obj_id] = entry
+        return entry
+
+    def get(self, obj_id: str, default=None):
+        """ Return an object, or default if the ID is unknown
+        """
+        try:
+            return self[obj_id]
+        except KeyError:
+            return default
+
+    def __setitem__(self, obj_id: str, obj):
+        """ Store an object
+        """
+        with self._lock:
+            self._entries[obj_id] = obj
+
+    def __delitem__(self, obj_id: str):
+        """ Remove an entry
+        """
+        with self._lock:
+            del self._entries[obj_id]
+
+    def __contains__(self, obj_id) -> bool:
+        """ Tell if an ID is present without building its object
+        """
+        return obj_id in self._entries
+
+    def __iter__(self):
+        """ Iterate over the IDs
+        """
+        return iter(self._entries)
+
+    def __len__(self) -> int:
+        """ Number of entries
+        """
+        return len(self._entries)
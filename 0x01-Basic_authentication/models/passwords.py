@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+""" Password hashing schemes of the User model
+"""
+from collections import OrderedDict
+from os import getenv
+from typing import Optional, Tuple
+import hashlib
+import hmac
+import os
+import threading
+from models.base import _env_choice
+
+
+SCHEME = _env_choice('USER_PASSWORD_SCHEME', 'sha256',
+                     ('sha256', 'pbkdf2', 'scrypt'))
+PBKDF2_ITERATIONS = int(getenv('USER_PBKDF2_ITERATIONS', 260000))
+SCRYPT_N = int(getenv('USER_SCRYPT_N', 2 ** 14))
+SCRYPT_R = int(getenv('USER_SCRYPT_R', 8))
+SCRYPT_P = int(getenv('USER_SCRYPT_P', 1))
+VERIFIED_CACHE_SIZE = int(getenv('USER_PASSWORD_CACHE_SIZE', 1024))
+
+_cache_key = os.urandom(32)
+_verified = OrderedDict()
+_verified_lock = threading.Lock()
+
+
+def hash_password(pwd: str, scheme: str = None) -> str:
+    """ Hash a password with a scheme, by default USER_PASSWORD_SCHEME:
+    - sha256: lowercase hex SHA-256, the historical format
+    - pbkdf2: pbkdf2_sha256$<iterations>$<salt>$<hash>
+    - scrypt: scrypt$<n>$<r>$<p>$<salt>$<hash>
+    """
+    scheme = scheme or SCHEME
+    data = pwd.encode()
+    if scheme == 'sha256':
+        return hashlib.sha256(data).hexdigest()
+    salt = os.urandom(16)
+    if scheme == 'pbkdf2':
+        digest = hashlib.pbkdf2_hmac('sha256', data, salt, PBKDF2_ITERATIONS)
+        return "pbkdf2_sha256${}${}${}".format(
+            PBKDF2_ITERATIONS, salt.hex(), digest.hex())
+    if scheme == 'scrypt':
+        digest = hashlib.scrypt(data, salt=salt, n=SCRYPT_N, r=SCRYPT_R,
+                                p=SCRYPT_P, maxmem=2 * 128 * SCRYPT_N *
+                                SCRYPT_R * SCRYPT_P, dklen=32)
+        return "scrypt${}${}${}${}${}".format(
+            SCRYPT_N, SCRYPT_R, SCRYPT_P, salt.hex(), digest.hex())
+    raise ValueError("Unknown password scheme: {}".format(scheme))
+
+
+def parse_password(stored: str) -> Optional[Tuple[str, tuple, bytes,
+                                                  bytes]]:
+    """ Split a stored hash into (scheme, parameters, salt, raw digest),
+    or None if it is not in a known format
+    """
+    try:
+        if '$' not in stored:
+            digest = bytes.fromhex(stored)
+            if len(digest) != 32 or digest.hex() != stored:
+                return None
+            return 'sha256', (), b'', digest
+        parts = stored.split('$')
+        if parts[0] == 'pbkdf2_sha256' and len(parts) == 4:
+            return ('pbkdf2', (int(parts[1]),), bytes.fromhex(parts[2]),
+                    bytes.fromhex(parts[3]))
+        if parts[0] == 'scrypt' and len(parts) == 6:
+            return ('scrypt', tuple(int(part) for part in parts[1:4]),
+                    bytes.fromhex(parts[4]), bytes.fromhex(parts[5]))
+    except ValueError:
+        pass
+    return None
+
+
+def _digest(pwd: str, parsed: tuple) -> bytes:
+    """ Raw digest of a password under the scheme, parameters and salt
+    of a parsed hash
+    """
+    scheme, params, salt, expected = parsed
+    data = pwd.encode()
+    if scheme == 'sha256':
+        return hashlib.sha256(data).digest()
+    if scheme == 'pbkdf2':
+        return hashlib.pbkdf2_hmac('sha256', data, salt, params[0],
+                                   len(expected))
+    n, r, p = params
+    return hashlib.scrypt(data, salt=salt, n=n, r=r, p=p,
+                          maxmem=2 * 128 * n * r * p, dklen=len(expected))
+
+
+def verify_password(pwd: str, stored: str, parsed: tuple) -> bool:
+    """ Tell in constant time if a password matches a parsed hash
+
+    Successful slow-hash verifications are remembered per process, keyed
+    by the stored hash and an HMAC of the password, so a stronger scheme
+    costs one derivation per user and password instead of one per call.
+    """
+    if parsed[0] == 'sha256':
+        return hmac.compare_digest(_digest(pwd, parsed), parsed[3])
+    key = None
+    if VERIFIED_CACHE_SIZE > 0:
+        key = (stored, hmac.new(_cache_key, pwd.encode(),
+                                hashlib.sha256).digest())
+        with _verified_lock:
+            if key in _verified:
+                _verified.move_to_end(key)
+                return True
+    if not hmac.compare_digest(_digest(pwd, parsed), parsed[3]):
+        return False
+    if key is not None:
+        with _verified_lock:
+            _verified[key] = True
+            while len(_verified) > VERIFIED_CACHE_SIZE:
+                _verified.popitem(last=False)
+    return True
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+""" SQLite storage engine of the models
+"""
+from contextlib import contextmanager
+from typing import Iterable, Iterator, List, Optional, TypeVar
+import json
+import os
+import sqlite3
+import threading
+
+
+class SQLiteStore():
+    """ Table holding the objects of one model class
+
+    Each row keeps the object's JSON (`to_json(True)`) in `data`, next to
+    an `id` primary key and one indexed column per attribute of
+    `indexed_attributes`. The database runs in WAL mode so readers never
+    block the writer.
+
+    The table and its indexes are created once per process. Queries
+    borrow a connection from a pool of at most pool_size idle ones, so
+    threads of a thread-per-request server reuse connections instead of
+    opening and setting up one each; close() closes the idle ones.
+    """
+
+    def __init__(self, cls: type, db_path: str, synchronous: str = 'NORMAL',
+                 pool_size: int = 8):
+        """ Initialize the store of a model class
+        """
+        self.cls = cls
+        self.db_path = db_path
+        self.synchronous = synchronous
+        self.pool_size = pool_size
+        self.table = '"{}"'.format(cls.__name__)
+        self.columns = ('id',) + tuple(cls.indexed_attributes)
+        self._idle = []
+        self._pool_lock = threading.Lock()
+        self._pid = None
+        self._schema_pid = None
+        self._sql_save = 'INSERT OR REPLACE INTO {} ({}, data) ' \
+            'VALUES ({})'.format(self.table, ', '.join(self.columns),
+                                 ', '.join('?' * (len(self.columns) + 1)))
+
+    def _create_schema(self, conn: sqlite3.Connection):
+        """ Switch the database to WAL and create the table and its
+        indexes if needed
+        """
+        conn.execute('PRAGMA journal_mode=WAL')
+        columns = ', '.join(self.columns[1:])
+        conn.execute('CREATE TABLE IF NOT EXISTS {} (id TEXT PRIMARY KEY, '
+                     '{}{}data TEXT NOT NULL)'.format(
+                         self.table, columns, ', ' if columns else ''))
+        for column in self.columns[1:]:
+            conn.execute('CREATE INDEX IF NOT EXISTS "{}_{}" ON {} ({})'
+                         .format(self.cls.__name__, column, self.table,
+                                 column))
+
+    def _checkout(self) -> sqlite3.Connection:
+        """ Take an idle connection, or open one; the schema is created
+        by the first connection of the process
+        """
+        pid = os.getpid()
+        with self._pool_lock:
+            if self._pid != pid:
+                self._idle = []
+                self._pid = pid
+            if self._idle:
+                return self._idle.pop()
+            conn = sqlite3.connect(self.db_path, timeout=30,
+                                   isolation_level=None,
+                                   check_same_thread=False)
+            try:
+                conn.execute('PRAGMA synchronous={}'.format(
+                    self.synchronous))
+                if self._schema_pid != pid:
+                    self._create_schema(conn)
+                    self._schema_pid = pid
+            except BaseException:
+                conn.close()
+                raise
+            return conn
+
+    def _checkin(self, conn: sqlite3.Connection):
+        """ Return a connection to the pool, closing it if the pool is
+        full or it was opened before a fork
+        """
+        if conn.in_transaction:
+            conn.rollback()
+        with self._pool_lock:
+            if self._pid == os.getpid() and \
+                    len(self._idle) < self.pool_size:
+                self._idle.append(conn)
+                return
+        conn.close()
+
+    @contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        """ Borrow a connection for the duration of a block
+        """
+        conn = self._checkout()
+        try:
+            yield conn
+        finally:
+            self._checkin(conn)
+
+    def close(self):
+        """ Close the idle connections of this process
+        """
+        with self._pool_lock:
+            idle = self._idle if self._pid == os.getpid() else []
+            self._idle = []
+        for conn in idle:
+            conn.close()
+
+    def _row(self, obj: TypeVar('Base')) -> tuple:
+        """ Column values of an object; values SQLite can't store are
+        kept in `data` only
+        """
+        row = []
+        for column in self.columns:
+            value = getattr(obj, column, None)
+            if value is not None and \
+                    not isinstance(value, (str, int, float, bytes)):
+                value = None
+            row.append(value)
+        row.append(json.dumps(obj.to_json(True)))
+        return tuple(row)
+
+    def _objects(self, rows: Iterable[tuple]) -> List[TypeVar('Base')]:
+        """ Build objects from rows whose first column is `data`
+        """
+        return [self.cls(**json.loads(row[0])) for row in rows]
+
+    def save(self, obj: TypeVar('Base')):
+        """ Insert or replace an object
+        """
+        row = self._row(obj)
+        with self._connect() as conn:
+            conn.execute(self._sql_save, row)
+
+    def save_many(self, objs: Iterable[TypeVar('Base')]):
+        """ Insert or replace several objects in one transaction
+        """
+        with self._connect() as conn, conn:
+            conn.execute('BEGIN')
+            conn.executemany(self._sql_save, map(self._row, objs))
+
+    def remove(self, objs: Iterable[TypeVar('Base')]) -> int:
+        """ Delete objects by ID in one transaction, returning how many
+        existed
+        """
+        with self._connect() as conn, conn:
+            conn.execute('BEGIN')
+            cursor = conn.executemany(
+                'DELETE FROM {} WHERE id = ?'.format(self.table),
+                ((obj.id,) for obj in objs))
+        return cursor.rowcount
+
+    def _query(self, sql: str, params: tuple = ()) -> list:
+        """ Rows of a query, fetched on a borrowed connection
+        """
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def count(self) -> int:
+        """ Number of objects
+        """
+        return self._query('SELECT COUNT(*) FROM {}'.format(
+            self.table))[0][0]
+
+    def get(self, obj_id: str) -> Optional[TypeVar('Base')]:
+        """ Object with the given ID, or None
+        """
+        objs = self._objects(self._query(
+            'SELECT data FROM {} WHERE id = ?'.format(self.table),
+            (obj_id,)))
+        return objs[0] if objs else None
+
+    def select(self, attributes: dict) -> List[TypeVar('Base')]:
+        """ Candidates for a search: the objects matching the first
+        indexed attribute of the query, or all objects
+        """
+        for column in self.columns:
+            if column not in attributes:
+                continue
+            try:
+                return self._objects(self._query(
+                    'SELECT data FROM {} WHERE {} IS ?'.format(
+                        self.table, column), (attributes[column],)))
+            except (sqlite3.InterfaceError, sqlite3.ProgrammingError):
+                break
+        return self._objects(self._query(
+            'SELECT data FROM {}'.format(self.table)))
+
+    def page(self, after: str = None,
+             limit: int = None) -> List[TypeVar('Base')]:
+        """ Objects ordered by ID, starting after the ID `after`
+        """
+        return self._objects(self._query(
+            'SELECT data FROM {} WHERE id > ? ORDER BY id LIMIT ?'.format(
+                self.table), ('' if after is None else after,
+                              -1 if limit is None else limit)))
+
+    def iter_all(self, batch_size: int = 1000) -> Iterator[TypeVar('Base')]:
+        """ Objects in table order, fetched batch_size rows at a time
+        """
+        last = 0
+        while True:
+            rows = self._query(
+                'SELECT rowid, data FROM {} WHERE rowid > ? ORDER BY rowid '
+                'LIMIT ?'.format(self.table), (last, batch_size))
+            for _, data in rows:
+                yield self.cls(**json.loads(data))
+            if len(rows) < batch_size:
+                return
+            last = rows[-1][0]
+
+    def export(self) -> dict:
+        """ JSON dictionaries of all objects, keyed by ID
+        """
+        return {obj_id: json.loads(data) for obj_id, data in self._query(
+            'SELECT id, data FROM {}'.format(self.table))}
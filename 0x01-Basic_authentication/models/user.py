@@ -2,13 +2,23 @@
 """ User module
 """
 import hashlib
-from models.base import Base
+import hmac
+from models.base import Base, COMPACT
+from models.passwords import hash_password, parse_password, \
+    verify_password
 
 
 class User(Base):
     """ User class
     """
 
+    indexed_attributes = ('email',)
+    interned_attributes = ('first_name', 'last_name')
+    transient_attributes = ('_password_digest',)
+    if COMPACT:
+        __slots__ = ('email', '_password', 'first_name', 'last_name',
+                     '_password_digest')
+
     def __init__(self, *args: list, **kwargs: dict):
         """ Initialize a User instance
         """
@@ -26,22 +36,35 @@ class User(Base):
 
     @password.setter
     def password(self, pwd: str):
-        """ Setter of a new password: encrypt in SHA256
+        """ Setter of a new password: hash it with USER_PASSWORD_SCHEME
+        (SHA256 by default)
         """
         if pwd is None or type(pwd) is not str:
             self._password = None
         else:
-            self._password = hashlib.sha256(pwd.encode()).hexdigest().lower()
+            self._password = hash_password(pwd)
 
     def is_valid_password(self, pwd: str) -> bool:
         """ Validate a password
+
+        The stored hash is parsed once into its raw digest, kept until
+        the hash changes, and compared in constant time.
         """
         if pwd is None or type(pwd) is not str:
             return False
-        if self.password is None:
+        stored = self._password
+        if stored is None:
+            return False
+        cached = getattr(self, '_password_digest', None)
+        if cached is None or cached[0] is not stored:
+            cached = self._password_digest = (stored, parse_password(stored))
+        parsed = cached[1]
+        if parsed is None:
             return False
-        pwd_e = pwd.encode()
-        return hashlib.sha256(pwd_e).hexdigest().lower() == self.password
+        if parsed[0] == 'sha256':
+            return hmac.compare_digest(hashlib.sha256(pwd.encode()).digest(),
+                                       parsed[3])
+        return verify_password(pwd, stored, parsed)
 
     def display_name(self) -> str:
         """ Display User name based on email/first_name/last_name
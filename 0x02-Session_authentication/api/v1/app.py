@@ -6,11 +6,20 @@ from os import getenv
 from flask import Flask, jsonify, abort, request
 from flask_cors import CORS
 from api.v1.views import app_views
+from api.v1.auth.auth import PathMatcher
 
 app = Flask(__name__)
 app.register_blueprint(app_views)
 CORS(app, resources={r"/api/v1/*": {"origins": "*"}})
 
+# Paths that don't require authentication, compiled once
+EXCLUDED_PATHS = PathMatcher([
+    '/api/v1/status/',
+    '/api/v1/unauthorized/',
+    '/api/v1/forbidden/',
+    '/api/v1/auth_session/login/'
+])
+
 # Initialize auth variable
 auth = None
 
@@ -22,6 +31,18 @@ if auth_type == 'auth':
 elif auth_type == 'basic_auth':
     from api.v1.auth.basic_auth import BasicAuth
     auth = BasicAuth()
+elif auth_type == 'session_auth':
+    from api.v1.auth.session_auth import SessionAuth
+    auth = SessionAuth()
+elif auth_type == 'session_exp_auth':
+    from api.v1.auth.session_exp_auth import SessionExpAuth
+    auth = SessionExpAuth()
+elif auth_type == 'session_db_auth':
+    from api.v1.auth.session_db_auth import SessionDBAuth
+    auth = SessionDBAuth()
+elif auth_type == 'session_backend_auth':
+    from api.v1.auth.session_backend_auth import SessionBackendAuth
+    auth = SessionBackendAuth()
 
 
 @app.errorhandler(404)
@@ -44,27 +65,27 @@ def forbidden(error) -> str:
 
 @app.before_request
 def before_request():
-    """ Method to handle before_request filtering """
+    """ Method to handle before_request filtering
+
+    The authenticated user is resolved once here and stored as
+    request.current_user for the views to reuse.
+    """
+    request.current_user = None
     if auth is None:
         return
 
-    # List of paths that don't require authentication
-    excluded_paths = [
-        '/api/v1/status/',
-        '/api/v1/unauthorized/',
-        '/api/v1/forbidden/'
-    ]
-
     # Check if authentication is required for this path
-    if not auth.require_auth(request.path, excluded_paths):
+    if not auth.require_auth(request.path, EXCLUDED_PATHS):
         return
 
-    # Check for authorization header
-    if auth.authorization_header(request) is None:
+    # Check for authorization header or session cookie
+    if auth.authorization_header(request) is None and \
+            auth.session_cookie(request) is None:
         abort(401)
 
-    # Check for current user
-    if auth.current_user(request) is None:
+    # Resolve the current user once for the whole request
+    request.current_user = auth.current_user(request)
+    if request.current_user is None:
         abort(403)
 
 
@@ -3,7 +3,69 @@
 Auth module for API authentication management
 """
 from flask import request
-from typing import List, TypeVar
+from os import getenv
+from typing import Iterable, List, TypeVar, Union
+
+
+class PathMatcher:
+    """
+    Excluded paths compiled for require_auth
+
+    Plain entries are normalized to end with a slash and kept in a set;
+    entries ending with '*' go into a character trie of prefixes, so a
+    lookup costs O(len(path)) whatever the number of entries.
+    """
+
+    _END = None
+
+    def __init__(self, excluded_paths: Iterable[str]):
+        """
+        Compiles the excluded paths
+
+        Args:
+            excluded_paths: Paths that don't require authentication
+        """
+        self._paths = list(excluded_paths)
+        self._exact = set()
+        self._prefixes = {}
+        for excluded_path in self._paths:
+            if excluded_path.endswith('*'):
+                node = self._prefixes
+                for char in excluded_path[:-1]:
+                    node = node.setdefault(char, {})
+                node[self._END] = True
+            else:
+                self._exact.add(
+                    excluded_path if excluded_path.endswith('/')
+                    else excluded_path + '/'
+                )
+
+    def __len__(self) -> int:
+        """
+        Returns the number of excluded paths
+        """
+        return len(self._paths)
+
+    def matches(self, path: str) -> bool:
+        """
+        Tells whether a path is excluded
+
+        Args:
+            path: The request path, normalized to end with a slash
+
+        Returns:
+            True if the path is listed or starts with a wildcard prefix
+        """
+        if path in self._exact:
+            return True
+        node = self._prefixes
+        for char in path:
+            if self._END in node:
+                return True
+            node = node.get(char)
+            if node is None:
+                return False
+        return self._END in node
 
 
 class Auth:
@@ -11,13 +73,15 @@ class Auth:
     Template class for all authentication systems
     """
 
-    def require_auth(self, path: str, excluded_paths: List[str]) -> bool:
+    def require_auth(self, path: str,
+                     excluded_paths: Union[List[str], PathMatcher]) -> bool:
         """
         Determines if authentication is required for a given path
 
         Args:
             path: The request path to check
-            excluded_paths: List of paths that don't require authentication
+            excluded_paths: List of paths that don't require authentication,
+                or a PathMatcher compiled from one
 
         Returns:
             True if authentication is required, False otherwise
@@ -28,22 +92,13 @@ class Auth:
         if excluded_paths is None or len(excluded_paths) == 0:
             return True
 
+        if not isinstance(excluded_paths, PathMatcher):
+            excluded_paths = PathMatcher(excluded_paths)
+
         # Normalize path by ensuring it ends with a slash
         normalized_path = path if path.endswith('/') else path + '/'
 
-        for excluded_path in excluded_paths:
-            if excluded_path.endswith('*'):
-                if normalized_path.startswith(excluded_path[:-1]):
-                    return False
-            else:
-                normalized_excluded = (
-                    excluded_path if excluded_path.endswith('/')
-                    else excluded_path + '/'
-                )
-                if normalized_path == normalized_excluded:
-                    return False
-
-        return True
+        return not excluded_paths.matches(normalized_path)
 
     def authorization_header(self, request=None) -> str:
         """
@@ -71,3 +126,18 @@ class Auth:
             User object or None
         """
         return None
+
+    def session_cookie(self, request=None) -> str:
+        """
+        Gets the session cookie value from the request
+
+        Args:
+            request: Flask request object
+
+        Returns:
+            Value of the cookie named by SESSION_NAME, or None
+        """
+        if request is None:
+            return None
+
+        return request.cookies.get(getenv('SESSION_NAME'))
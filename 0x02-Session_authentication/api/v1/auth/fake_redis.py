@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""In-process stand-in for a Redis server, for running the redis
+session backend without an external service
+"""
+from typing import List, Optional, Tuple
+import socketserver
+import threading
+import time
+
+
+class _RESPHandler(socketserver.StreamRequestHandler):
+    """Serves RESP commands on one client connection
+    """
+
+    def _read_command(self) -> Optional[List[bytes]]:
+        """Reads one RESP array of bulk strings, None on disconnect
+        """
+        line = self.rfile.readline()
+        if not line:
+            return None
+        args = []
+        for _ in range(int(line[1:-2])):
+            length = int(self.rfile.readline()[1:-2])
+            args.append(self.rfile.read(length + 2)[:-2])
+        return args
+
+    def handle(self) -> None:
+        """Answers commands until the client disconnects
+        """
+        while True:
+            args = self._read_command()
+            if args is None:
+                return
+            name = args[0].decode().upper()
+            method = getattr(self.server, 'cmd_' + name.lower(), None)
+            if method is None:
+                reply = b"-ERR unknown command '%s'\r\n" % name.encode()
+            else:
+                try:
+                    reply = method(*args[1:])
+                except (TypeError, ValueError):
+                    reply = b"-ERR syntax error in '%s'\r\n" % name.encode()
+            self.wfile.write(reply)
+
+
+class FakeRedisServer(socketserver.ThreadingTCPServer):
+    """Threaded TCP server implementing the subset of Redis used by
+    RedisSessionBackend: PING, SELECT, SET (EX/PX), GET, DEL, EXPIRE,
+    TTL and FLUSHDB, with key expiry
+    """
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, host: str = '127.0.0.1', port: int = 0):
+        """Binds the server; port 0 picks a free port
+        """
+        super().__init__((host, port), _RESPHandler)
+        self._data = {}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        """Returns the (host, port) the server listens on
+        """
+        return self.server_address[:2]
+
+    def start(self) -> 'FakeRedisServer':
+        """Serves requests from a background thread
+        """
+        self._thread = threading.Thread(target=self.serve_forever,
+                                        daemon=True, name="fake-redis")
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stops serving and closes the listening socket
+        """
+        self.shutdown()
+        self.server_close()
+
+    @staticmethod
+    def _bulk(value: Optional[bytes]) -> bytes:
+        """Encodes a bulk string reply
+        """
+        if value is None:
+            return b'$-1\r\n'
+        return b'$%d\r\n%s\r\n' % (len(value), value)
+
+    def _live(self, key: bytes) -> Optional[Tuple[bytes, Optional[float]]]:
+        """Returns the (value, deadline) of a key, dropping it if expired
+        """
+        entry = self._data.get(key)
+        if entry is not None and entry[1] is not None \
+                and entry[1] <= time.monotonic():
+            del self._data[key]
+            return None
+        return entry
+
+    def cmd_ping(self, *args) -> bytes:
+        """PING
+        """
+        return b'+PONG\r\n'
+
+    def cmd_select(self, db: bytes) -> bytes:
+        """SELECT db (a single keyspace is shared)
+        """
+        return b'+OK\r\n'
+
+    def cmd_flushdb(self) -> bytes:
+        """FLUSHDB
+        """
+        with self._lock:
+            self._data.clear()
+        return b'+OK\r\n'
+
+    def cmd_set(self, key: bytes, value: bytes, *options) -> bytes:
+        """SET key value [EX seconds | PX milliseconds]
+        """
+        deadline = None
+        if len(options) >= 2:
+            unit = options[0].upper()
+            if unit == b'EX':
+                deadline = time.monotonic() + int(options[1])
+            elif unit == b'PX':
+                deadline = time.monotonic() + int(options[1]) / 1000
+        with self._lock:
+            self._data[key] = (value, deadline)
+        return b'+OK\r\n'
+
+    def cmd_get(self, key: bytes) -> bytes:
+        """GET key
+        """
+        with self._lock:
+            entry = self._live(key)
+        return self._bulk(entry[0] if entry else None)
+
+    def cmd_del(self, *keys) -> bytes:
+        """DEL key [key ...]
+        """
+        with self._lock:
+            deleted = 0
+            for key in keys:
+                if self._live(key) is not None:
+                    del self._data[key]
+                    deleted += 1
+        return b':%d\r\n' % deleted
+
+    def cmd_expire(self, key: bytes, seconds: bytes) -> bytes:
+        """EXPIRE key seconds
+        """
+        with self._lock:
+            entry = self._live(key)
+            if entry is None:
+                return b':0\r\n'
+            self._data[key] = (entry[0], time.monotonic() + int(seconds))
+        return b':1\r\n'
+
+    def cmd_ttl(self, key: bytes) -> bytes:
+        """TTL key: -2 if missing, -1 without expiry
+        """
+        with self._lock:
+            entry = self._live(key)
+        if entry is None:
+            return b':-2\r\n'
+        if entry[1] is None:
+            return b':-1\r\n'
+        return b':%d\r\n' % round(entry[1] - time.monotonic())
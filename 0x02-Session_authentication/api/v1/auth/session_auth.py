@@ -2,15 +2,18 @@
 """Session Authentication module for API
 """
 from api.v1.auth.auth import Auth
+from api.v1.auth.session_store import session_store
 from models.user import User
 import uuid
 
 
 class SessionAuth(Auth):
     """Session Authentication class that implements session-based auth
+    Sessions live in a dict, or in a bounded LRU store when
+    SESSION_MAX_ENTRIES or SESSION_MAX_PER_USER is set
     """
 
-    user_id_by_session_id = {}
+    user_id_by_session_id = session_store()
 
     def create_session(self, user_id: str = None) -> str:
         """Creates a Session ID for a given user_id
@@ -37,12 +40,16 @@ class SessionAuth(Auth):
         return self.user_id_by_session_id.get(session_id)
 
     def current_user(self, request=None):
-        """Retrieves the current user based on session cookie
+        """Retrieves the current user based on session cookie, reusing
+        the one already resolved for the request by before_request
         Args:
             request: The Flask request object
         Returns:
             The User object if found, None otherwise
         """
+        user = getattr(request, 'current_user', None)
+        if user is not None:
+            return user
         session_cookie = self.session_cookie(request)
         user_id = self.user_id_for_session_id(session_cookie)
         return User.get(user_id)
@@ -65,5 +72,5 @@ class SessionAuth(Auth):
         if user_id is None:
             return False
 
-        del self.user_id_by_session_id[session_id]
+        self.user_id_by_session_id.pop(session_id, None)
         return True
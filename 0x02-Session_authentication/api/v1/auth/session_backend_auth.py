@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""Session Authentication over a pluggable storage backend
+"""
+from api.v1.auth.session_auth import SessionAuth
+from api.v1.auth.session_backends import SessionBackend, session_backend
+import os
+import uuid
+
+
+class SessionBackendAuth(SessionAuth):
+    """Session Authentication storing sessions in a SessionBackend
+    The backend is chosen by SESSION_BACKEND (memory, file or redis) so
+    several workers or nodes can share sessions
+    """
+
+    def __init__(self, backend: SessionBackend = None):
+        """Initialize SessionBackendAuth instance
+        Args:
+            backend: Backend to use instead of the configured one
+        """
+        try:
+            self.session_duration = int(os.getenv('SESSION_DURATION', 0))
+        except (ValueError, TypeError):
+            self.session_duration = 0
+        self.backend = backend or session_backend(self.session_duration)
+
+    def create_session(self, user_id: str = None) -> str:
+        """Creates a Session ID for a given user_id in the backend
+        Args:
+            user_id: The user ID to create session for
+        Returns:
+            The session ID if successful, None otherwise
+        """
+        if user_id is None or not isinstance(user_id, str):
+            return None
+        session_id = str(uuid.uuid4())
+        self.backend.set(session_id, user_id)
+        return session_id
+
+    def user_id_for_session_id(self, session_id: str = None) -> str:
+        """Retrieves the user ID of a live session from the backend
+        Args:
+            session_id: The session ID to look up
+        Returns:
+            The user ID if found, None otherwise
+        """
+        if session_id is None or not isinstance(session_id, str):
+            return None
+        return self.backend.get(session_id)
+
+    def destroy_session(self, request=None) -> bool:
+        """Destroys an authenticated session in the backend
+        Args:
+            request: The Flask request object
+        Returns:
+            True if session was destroyed, False otherwise
+        """
+        if request is None:
+            return False
+
+        session_id = self.session_cookie(request)
+        if session_id is None:
+            return False
+        return self.backend.delete(session_id)
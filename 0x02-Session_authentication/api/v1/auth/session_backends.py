@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+"""Session storage backends for session authentication
+"""
+from api.v1.auth.session_store import trim_user_sessions
+from datetime import datetime, timedelta
+from typing import List, Optional
+from urllib.parse import urlparse
+import os
+import socket
+import threading
+import time
+
+
+class SessionBackend:
+    """Interface of a session storage backend
+    Sessions expire ttl seconds after creation; 0 disables expiration.
+    """
+
+    def __init__(self, ttl: int = 0):
+        """Initialize the backend
+        Args:
+            ttl: Session lifetime in seconds
+        """
+        self.ttl = ttl
+
+    def set(self, session_id: str, user_id: str) -> None:
+        """Stores a session
+        Args:
+            session_id: The session ID
+            user_id: The user ID owning the session
+        """
+        raise NotImplementedError
+
+    def get(self, session_id: str) -> Optional[str]:
+        """Looks up a session
+        Args:
+            session_id: The session ID
+        Returns:
+            The user ID, or None if the session is unknown or expired
+        """
+        raise NotImplementedError
+
+    def delete(self, session_id: str) -> bool:
+        """Deletes a session
+        Args:
+            session_id: The session ID
+        Returns:
+            True if the session existed
+        """
+        raise NotImplementedError
+
+
+class MemorySessionBackend(SessionBackend):
+    """Process-local sessions, expired lazily on lookup
+    """
+
+    def __init__(self, ttl: int = 0):
+        """Initialize an empty backend
+        """
+        super().__init__(ttl)
+        self._sessions = {}
+
+    def set(self, session_id: str, user_id: str) -> None:
+        """Stores a session with its expiry deadline
+        """
+        expires_at = (time.monotonic() + self.ttl if self.ttl > 0
+                      else None)
+        self._sessions[session_id] = (user_id, expires_at)
+
+    def get(self, session_id: str) -> Optional[str]:
+        """Returns the user ID of a live session
+        """
+        session = self._sessions.get(session_id)
+        if session is None:
+            return None
+        user_id, expires_at = session
+        if expires_at is not None and expires_at < time.monotonic():
+            self._sessions.pop(session_id, None)
+            return None
+        return user_id
+
+    def delete(self, session_id: str) -> bool:
+        """Removes a session
+        """
+        return self._sessions.pop(session_id, None) is not None
+
+
+class FileSessionBackend(SessionBackend):
+    """Sessions persisted as UserSession rows in .db_UserSession.json
+    With SESSION_MAX_PER_USER set, a user keeps at most that many rows
+    """
+
+    def set(self, session_id: str, user_id: str) -> None:
+        """Saves a UserSession; its created_at drives expiration
+        """
+        from models.user_session import UserSession
+        UserSession.reload_if_changed()
+        max_per_user = int(os.getenv('SESSION_MAX_PER_USER', 0))
+        if max_per_user > 0:
+            trim_user_sessions(user_id, max_per_user - 1)
+        UserSession(user_id=user_id, session_id=session_id).save()
+
+    def _find(self, session_id: str):
+        """Returns the UserSession row of a session ID, or None
+        """
+        from models.user_session import UserSession
+        UserSession.reload_if_changed()
+        user_sessions = UserSession.search({'session_id': session_id})
+        return user_sessions[0] if user_sessions else None
+
+    def get(self, session_id: str) -> Optional[str]:
+        """Returns the user ID of a live session, purging it if expired
+        """
+        user_session = self._find(session_id)
+        if user_session is None:
+            return None
+        if self.ttl > 0 and user_session.created_at + timedelta(
+                seconds=self.ttl) < datetime.utcnow():
+            user_session.remove()
+            return None
+        return user_session.user_id
+
+    def delete(self, session_id: str) -> bool:
+        """Removes the UserSession row of a session
+        """
+        user_session = self._find(session_id)
+        if user_session is None:
+            return False
+        user_session.remove()
+        return True
+
+
+class RedisSessionBackend(SessionBackend):
+    """Sessions in a Redis-protocol key-value server, expired by the
+    server through native TTLs
+    """
+
+    def __init__(self, ttl: int = 0, host: str = 'localhost',
+                 port: int = 6379, db: int = 0, prefix: str = 'session:',
+                 timeout: float = 5.0):
+        """Initialize the backend; the connection is opened lazily
+        """
+        super().__init__(ttl)
+        self.host = host
+        self.port = port
+        self.db = db
+        self.prefix = prefix
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _encode(*args) -> bytes:
+        """Encodes one command as a RESP array of bulk strings
+        """
+        parts = [b'*%d\r\n' % len(args)]
+        for arg in args:
+            if not isinstance(arg, bytes):
+                arg = str(arg).encode()
+            parts.append(b'$%d\r\n%s\r\n' % (len(arg), arg))
+        return b''.join(parts)
+
+    def _read_reply(self):
+        """Reads one RESP reply from the connection
+        Error replies are returned as RuntimeError instances so that a
+        pipeline always consumes every reply before raising
+        """
+        line = self._reader.readline()
+        if not line:
+            raise ConnectionError("Connection closed by server")
+        kind, payload = line[:1], line[1:-2]
+        if kind == b'+':
+            return payload.decode()
+        if kind == b'-':
+            return RuntimeError(payload.decode())
+        if kind == b':':
+            return int(payload)
+        if kind == b'$':
+            length = int(payload)
+            if length < 0:
+                return None
+            return self._reader.read(length + 2)[:-2].decode()
+        if kind == b'*':
+            length = int(payload)
+            if length < 0:
+                return None
+            return [self._read_reply() for _ in range(length)]
+        raise ConnectionError("Invalid reply: {!r}".format(line))
+
+    def _connect(self) -> None:
+        """Opens the connection and selects the database
+        """
+        self._sock = socket.create_connection((self.host, self.port),
+                                              self.timeout)
+        self._reader = self._sock.makefile('rb')
+        if self.db:
+            self._sock.sendall(self._encode('SELECT', self.db))
+            reply = self._read_reply()
+            if isinstance(reply, RuntimeError):
+                raise reply
+
+    def _close(self) -> None:
+        """Drops the connection after an I/O error
+        """
+        if self._sock is not None:
+            self._reader.close()
+            self._sock.close()
+        self._sock = None
+        self._reader = None
+
+    def pipeline(self, commands: List[tuple]) -> list:
+        """Sends several commands in one write and reads all replies
+        A failure before any byte of the commands reached the socket,
+        such as a stale or refused connection, is retried once on a new
+        connection; later ones are raised, since the server may have
+        run the commands already.
+        Args:
+            commands: Tuples of command name and arguments
+        Returns:
+            The replies, in command order
+        """
+        payload = memoryview(b''.join(self._encode(*command)
+                                      for command in commands))
+        with self._lock:
+            for attempt in range(2):
+                sent = 0
+                try:
+                    if self._sock is None:
+                        self._connect()
+                    while sent < len(payload):
+                        sent += self._sock.send(payload[sent:])
+                    replies = [self._read_reply() for _ in commands]
+                    break
+                except (OSError, ConnectionError):
+                    self._close()
+                    if attempt or sent:
+                        raise
+        for reply in replies:
+            if isinstance(reply, RuntimeError):
+                raise reply
+        return replies
+
+    def set(self, session_id: str, user_id: str) -> None:
+        """Stores a session, letting the server expire it after ttl
+        """
+        command = ('SET', self.prefix + session_id, user_id)
+        if self.ttl > 0:
+            command += ('EX', self.ttl)
+        self.pipeline([command])
+
+    def get(self, session_id: str) -> Optional[str]:
+        """Returns the user ID of a live session
+        """
+        return self.pipeline([('GET', self.prefix + session_id)])[0]
+
+    def get_many(self, session_ids: List[str]) -> List[Optional[str]]:
+        """Looks up several sessions in a single round trip
+        """
+        return self.pipeline([('GET', self.prefix + session_id)
+                              for session_id in session_ids])
+
+    def delete(self, session_id: str) -> bool:
+        """Removes a session
+        """
+        return self.pipeline([('DEL', self.prefix + session_id)])[0] > 0
+
+
+def session_backend(ttl: int = 0) -> SessionBackend:
+    """Creates the backend selected by SESSION_BACKEND
+    Args:
+        ttl: Session lifetime in seconds, 0 for no expiration
+    Returns:
+        A memory (default), file or redis backend; the redis backend
+        connects to SESSION_REDIS_URL (redis://host:port/db)
+    Raises:
+        ValueError: SESSION_BACKEND names no known backend
+    """
+    kind = os.getenv('SESSION_BACKEND', 'memory')
+    if kind not in ('memory', 'file', 'redis'):
+        raise ValueError("SESSION_BACKEND must be one of memory, file, "
+                         "redis, not {!r}".format(kind))
+    if kind == 'file':
+        return FileSessionBackend(ttl)
+    if kind == 'redis':
+        url = urlparse(os.getenv('SESSION_REDIS_URL',
+                                 'redis://localhost:6379/0'))
+        db = int(url.path.lstrip('/') or 0)
+        return RedisSessionBackend(ttl, url.hostname or 'localhost',
+                                   url.port or 6379, db)
+    return MemorySessionBackend(ttl)
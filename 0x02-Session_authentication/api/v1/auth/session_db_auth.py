@@ -2,14 +2,24 @@
 """Session Database Authentication module
 """
 from api.v1.auth.session_exp_auth import SessionExpAuth
+from api.v1.auth.session_store import trim_user_sessions
 from models.user_session import UserSession
 from datetime import datetime, timedelta
+import os
 
 
 class SessionDBAuth(SessionExpAuth):
     """Session Database Authentication class
+
+    Sessions are served from the in-memory UserSession store, which is
+    reloaded only when another worker has changed the backing file.
+    Expired rows are purged when looked up and on each reaper pass, and
+    with SESSION_MAX_PER_USER set a login removes the user's oldest rows
+    beyond that limit.
     """
 
+    purged_sessions = 0
+
     def create_session(self, user_id: str = None) -> str:
         """Creates and stores a new session in database
         Args:
@@ -24,6 +34,10 @@ class SessionDBAuth(SessionExpAuth):
         if session_id is None:
             return None
 
+        UserSession.reload_if_changed()
+        max_per_user = int(os.getenv('SESSION_MAX_PER_USER', 0))
+        if max_per_user > 0:
+            trim_user_sessions(user_id, max_per_user - 1)
         user_session = UserSession(user_id=user_id, session_id=session_id)
         user_session.save()
         return session_id
@@ -38,7 +52,9 @@ class SessionDBAuth(SessionExpAuth):
         if session_id is None or not isinstance(session_id, str):
             return None
 
-        UserSession.load_from_file()
+        if self.session_duration > 0:
+            self.purge_expired(self.SWEEP_BATCH)
+        UserSession.reload_if_changed()
         user_sessions = UserSession.search({'session_id': session_id})
         if not user_sessions:
             return None
@@ -53,10 +69,47 @@ class SessionDBAuth(SessionExpAuth):
         expiration_time = user_session.created_at + timedelta(
             seconds=self.session_duration)
         if expiration_time < datetime.now():
+            user_session.remove()
+            with self.sessions_lock:
+                SessionDBAuth.purged_sessions += 1
             return None
 
         return user_session.user_id
 
+    def purge_expired(self, limit: int = None) -> int:
+        """Evicts expired sessions from memory and, on a full pass, the
+        expired UserSession rows from the database
+        Args:
+            limit: Maximum number of in-memory sessions to examine,
+                None for a full pass
+        Returns:
+            The number of sessions evicted
+        """
+        evicted = super().purge_expired(limit)
+        if limit is not None or self.session_duration <= 0:
+            return evicted
+
+        UserSession.reload_if_changed()
+        cutoff = datetime.now() - timedelta(seconds=self.session_duration)
+        expired = [user_session for user_session in UserSession.all()
+                   if user_session.created_at < cutoff]
+        removed = UserSession.remove_many(expired)
+        with self.sessions_lock:
+            SessionDBAuth.purged_sessions += removed
+        return evicted + removed
+
+    def session_stats(self) -> dict:
+        """Reports session counts
+        Returns:
+            Live and evicted in-memory sessions, and live and purged
+            UserSession rows
+        """
+        stats = super().session_stats()
+        UserSession.reload_if_changed()
+        stats['persisted'] = UserSession.count()
+        stats['purged'] = self.purged_sessions
+        return stats
+
     def destroy_session(self, request=None) -> bool:
         """Destroys a session from database
         Args:
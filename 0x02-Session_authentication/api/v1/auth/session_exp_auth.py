@@ -2,15 +2,31 @@
 """Session Expiration Authentication module
 """
 from api.v1.auth.session_auth import SessionAuth
+from api.v1.auth.session_store import SessionEntry
 from datetime import datetime, timedelta
+import heapq
+import logging
 import os
+import threading
+import time
+
+_logger = logging.getLogger(__name__)
 
 
 class SessionExpAuth(SessionAuth):
     """Session Authentication with Expiration class
     Implements session authentication with expiration functionality
+
+    Expiry times are kept in a min-heap so expired sessions are evicted
+    in time order: a few per access, and all of them on each pass of the
+    optional reaper thread (SESSION_REAPER_INTERVAL seconds).
     """
 
+    SWEEP_BATCH = 16
+    expiry_heap = []
+    evicted_sessions = 0
+    sessions_lock = threading.Lock()
+
     def __init__(self):
         """Initialize SessionExpAuth instance
         Sets session_duration from environment variable or defaults to 0
@@ -19,6 +35,61 @@ class SessionExpAuth(SessionAuth):
             self.session_duration = int(os.getenv('SESSION_DURATION', 0))
         except (ValueError, TypeError):
             self.session_duration = 0
+        try:
+            reaper_interval = float(os.getenv('SESSION_REAPER_INTERVAL', 0))
+        except (ValueError, TypeError):
+            reaper_interval = 0
+        if reaper_interval > 0 and self.session_duration > 0:
+            threading.Thread(target=self._reap, args=(reaper_interval,),
+                             daemon=True, name="session-reaper").start()
+
+    def _reap(self, interval: float) -> None:
+        """Background loop evicting every expired session; a failed
+        pass is logged and the next one runs as scheduled
+        Args:
+            interval: Seconds between two passes
+        """
+        while True:
+            time.sleep(interval)
+            try:
+                self.purge_expired()
+            except Exception:
+                _logger.exception("Session reaper pass failed")
+
+    def purge_expired(self, limit: int = None) -> int:
+        """Evicts expired sessions in expiry order
+        Args:
+            limit: Maximum number of heap entries to pop, None for all
+        Returns:
+            The number of sessions evicted
+        """
+        evicted = 0
+        now = datetime.now()
+        with self.sessions_lock:
+            heap = self.expiry_heap
+            while heap and heap[0][0] < now:
+                if limit is not None and limit <= 0:
+                    break
+                _, session_id = heapq.heappop(heap)
+                if self.user_id_by_session_id.pop(session_id, None):
+                    evicted += 1
+                if limit is not None:
+                    limit -= 1
+            SessionExpAuth.evicted_sessions += evicted
+        return evicted
+
+    def session_stats(self) -> dict:
+        """Reports session counts
+        Returns:
+            The number of live sessions, of sessions evicted on expiry
+            and of sessions evicted by the store's capacity limits
+        """
+        return {
+            'live': len(self.user_id_by_session_id),
+            'evicted': self.evicted_sessions,
+            'capacity_evicted': getattr(self.user_id_by_session_id,
+                                        'evicted', 0)
+        }
 
     def create_session(self, user_id: str = None) -> str:
         """Creates a session with expiration tracking
@@ -34,10 +105,15 @@ class SessionExpAuth(SessionAuth):
         if session_id is None:
             return None
 
-        self.user_id_by_session_id[session_id] = {
-            'user_id': user_id,
-            'created_at': datetime.now()
-        }
+        created_at = datetime.now()
+        self.user_id_by_session_id[session_id] = SessionEntry(user_id,
+                                                              created_at)
+        if self.session_duration > 0:
+            expires_at = created_at + timedelta(
+                seconds=self.session_duration)
+            with self.sessions_lock:
+                heapq.heappush(self.expiry_heap, (expires_at, session_id))
+            self.purge_expired(self.SWEEP_BATCH)
         return session_id
 
     def user_id_for_session_id(self, session_id: str = None) -> str:
@@ -50,14 +126,16 @@ class SessionExpAuth(SessionAuth):
         if session_id is None or not isinstance(session_id, str):
             return None
 
-        session_dict = self.user_id_by_session_id.get(session_id)
-        if session_dict is None:
+        if self.session_duration > 0:
+            self.purge_expired(self.SWEEP_BATCH)
+        session_entry = self.user_id_by_session_id.get(session_id)
+        if session_entry is None:
             return None
 
         if self.session_duration <= 0:
-            return session_dict.get('user_id')
+            return session_entry.user_id
 
-        created_at = session_dict.get('created_at')
+        created_at = session_entry.created_at
         if created_at is None:
             return None
 
@@ -65,4 +143,4 @@ class SessionExpAuth(SessionAuth):
         if expiration_time < datetime.now():
             return None
 
-        return session_dict.get('user_id')
+        return session_entry.user_id
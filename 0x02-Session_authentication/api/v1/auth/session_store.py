@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""Session storage structures for session authentication
+"""
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from datetime import datetime
+import os
+import threading
+
+_MISSING = object()
+
+
+class SessionEntry:
+    """Compact session record used instead of a per-session dict
+    """
+
+    __slots__ = ('user_id', 'created_at')
+
+    def __init__(self, user_id: str, created_at: datetime = None):
+        """Initialize a SessionEntry
+        Args:
+            user_id: The user ID owning the session
+            created_at: Creation time of the session
+        """
+        self.user_id = user_id
+        self.created_at = created_at
+
+
+class LRUSessionStore(MutableMapping):
+    """Session ID mapping bounded in total size and per user
+    Lookups refresh a session; the least recently used session is evicted
+    beyond max_entries, and a user's oldest session beyond max_per_user.
+    A limit of 0 disables it. Every operation, including get and pop,
+    runs atomically under one lock; pop does not refresh the session.
+
+    The limits only bound sessions kept in this mapping: the UserSession
+    rows of SessionDBAuth and FileSessionBackend are capped per user by
+    trim_user_sessions, while the memory and redis backends of
+    SessionBackendAuth are bounded by their expiry only.
+    """
+
+    def __init__(self, max_entries: int = 0, max_per_user: int = 0):
+        """Initialize an empty store
+        Args:
+            max_entries: Maximum number of sessions
+            max_per_user: Maximum number of sessions of one user
+        """
+        self.max_entries = max_entries
+        self.max_per_user = max_per_user
+        self.evicted = 0
+        self._sessions = OrderedDict()
+        self._by_user = {}
+        self._lock = threading.RLock()
+
+    @staticmethod
+    def _user_of(value) -> str:
+        """Returns the user ID of a stored value
+        Args:
+            value: A user ID or a SessionEntry
+        Returns:
+            The user ID
+        """
+        return getattr(value, 'user_id', value)
+
+    def _discard(self, session_id: str):
+        """Removes a session and its per-user bookkeeping
+        Args:
+            session_id: The session ID to remove
+        Returns:
+            The removed value
+        """
+        value = self._sessions.pop(session_id)
+        if self.max_per_user:
+            user_id = self._user_of(value)
+            session_ids = self._by_user[user_id]
+            session_ids.remove(session_id)
+            if not session_ids:
+                del self._by_user[user_id]
+        return value
+
+    def __getitem__(self, session_id: str):
+        """Returns a session and marks it as recently used
+        """
+        with self._lock:
+            value = self._sessions[session_id]
+            self._sessions.move_to_end(session_id)
+            return value
+
+    def get(self, session_id: str, default=None):
+        """Returns a session and marks it as recently used, or default
+        if it is not stored
+        """
+        with self._lock:
+            value = self._sessions.get(session_id, _MISSING)
+            if value is _MISSING:
+                return default
+            self._sessions.move_to_end(session_id)
+            return value
+
+    def pop(self, session_id: str, default=_MISSING):
+        """Removes a session and returns it, or default if it is not
+        stored; raises KeyError when no default is given
+        """
+        with self._lock:
+            if session_id in self._sessions:
+                return self._discard(session_id)
+        if default is _MISSING:
+            raise KeyError(session_id)
+        return default
+
+    def __setitem__(self, session_id: str, value) -> None:
+        """Stores a session, evicting sessions over the limits
+        """
+        with self._lock:
+            if session_id in self._sessions:
+                self._discard(session_id)
+            self._sessions[session_id] = value
+            if self.max_per_user:
+                session_ids = self._by_user.setdefault(
+                    self._user_of(value), [])
+                session_ids.append(session_id)
+                while len(session_ids) > self.max_per_user:
+                    self._discard(session_ids[0])
+                    self.evicted += 1
+            while self.max_entries and \
+                    len(self._sessions) > self.max_entries:
+                self._discard(next(iter(self._sessions)))
+                self.evicted += 1
+
+    def __delitem__(self, session_id: str) -> None:
+        """Removes a session
+        """
+        with self._lock:
+            if session_id not in self._sessions:
+                raise KeyError(session_id)
+            self._discard(session_id)
+
+    def __iter__(self):
+        """Iterates over a snapshot of the session IDs
+        """
+        with self._lock:
+            return iter(list(self._sessions))
+
+    def __len__(self) -> int:
+        """Returns the number of stored sessions
+        """
+        return len(self._sessions)
+
+    def __contains__(self, session_id) -> bool:
+        """Tells if a session is stored without refreshing it
+        """
+        return session_id in self._sessions
+
+
+def trim_user_sessions(user_id: str, keep: int) -> int:
+    """Removes the oldest UserSession rows of a user beyond keep
+    Args:
+        user_id: The user ID whose sessions are trimmed
+        keep: Number of most recent sessions to keep
+    Returns:
+        The number of rows removed
+    """
+    from models.user_session import UserSession
+    user_sessions = UserSession.search({'user_id': user_id})
+    excess = len(user_sessions) - max(keep, 0)
+    if excess <= 0:
+        return 0
+    user_sessions.sort(key=lambda user_session: user_session.created_at)
+    return UserSession.remove_many(user_sessions[:excess])
+
+
+def session_store() -> MutableMapping:
+    """Creates the session ID mapping selected by the environment
+    Returns:
+        An LRUSessionStore if SESSION_MAX_ENTRIES or SESSION_MAX_PER_USER
+        is set, a plain dict otherwise
+    """
+    max_entries = int(os.getenv('SESSION_MAX_ENTRIES', 0))
+    max_per_user = int(os.getenv('SESSION_MAX_PER_USER', 0))
+    if max_entries or max_per_user:
+        return LRUSessionStore(max_entries, max_per_user)
+    return {}
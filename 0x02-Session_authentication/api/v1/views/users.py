@@ -2,31 +2,81 @@
 """ Module of Users views
 """
 from api.v1.views import app_views
-from flask import abort, jsonify, request
+from flask import (Response, abort, json, jsonify, request,
+                   stream_with_context)
 from models.user import User
+from typing import Iterable
+
+
+def stream_json_list(objs: Iterable, fields: list = None):
+    """ Yield a JSON array of objects one element at a time, encoded
+    like jsonify (app JSON settings, compact separators)
+    """
+    yield '['
+    for i, obj in enumerate(objs):
+        yield (',' if i else '') + json.dumps(obj.to_json(fields=fields),
+                                              separators=(',', ':'))
+    yield ']\n'
 
 
 @app_views.route('/users', methods=['GET'], strict_slashes=False)
 def view_all_users() -> str:
     """ GET /api/v1/users
+    Query parameters (all optional):
+      - limit: maximum number of users, ordered by ID
+      - cursor: ID of the last user of the previous page
+      - fields: comma-separated attributes to return (ex: id,email)
+      - stream: 1 to send the list as a chunked response; without limit
+        and cursor, users are then read in batches instead of as a list
     Return:
-      - list of all User objects JSON represented
+      - list of User objects JSON represented; when the page is full,
+        the X-Next-Cursor header holds the cursor of the next page
+      - 400 if limit is not a positive integer
     """
-    all_users = [user.to_json() for user in User.all()]
-    return jsonify(all_users)
+    limit = request.args.get('limit')
+    if limit is not None:
+        try:
+            limit = int(limit)
+        except ValueError:
+            limit = 0
+        if limit <= 0:
+            return jsonify({'error': "limit must be a positive integer"}), 400
+    cursor = request.args.get('cursor')
+    fields = request.args.get('fields')
+    if fields is not None:
+        fields = [field for field in fields.split(',') if field]
+    stream = request.args.get('stream') == '1'
+
+    if limit is None and cursor is None:
+        users = User.iter_all() if stream else User.all()
+    else:
+        users = User.page(cursor, limit)
+    if stream:
+        response = Response(stream_with_context(
+            stream_json_list(users, fields)), mimetype='application/json')
+    else:
+        response = jsonify([user.to_json(fields=fields) for user in users])
+    if limit is not None and len(users) == limit:
+        response.headers['X-Next-Cursor'] = users[-1].id
+    return response
 
 
 @app_views.route('/users/<user_id>', methods=['GET'], strict_slashes=False)
 def view_one_user(user_id: str = None) -> str:
     """ GET /api/v1/users/:id
     Path parameter:
-      - User ID
+      - User ID, or "me" for the authenticated user
     Return:
       - User object JSON represented
       - 404 if the User ID doesn't exist
     """
     if user_id is None:
         abort(404)
+    if user_id == 'me':
+        user = getattr(request, 'current_user', None)
+        if user is None:
+            abort(404)
+        return jsonify(user.to_json())
     user = User.get(user_id)
     if user is None:
         abort(404)
@@ -0,0 +1,59 @@
+#!/usr/bin/env python3
+""" Report of the memory used per User in each MODELS_COMPACT mode
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+MODES = ("", "slots", "epoch")
+
+
+def measure(count: int):
+    """ Print the bytes per User of the current mode: the objects alone,
+    then everything kept resident by load_from_file (DATA and indexes)
+    """
+    from bench_search import write_users
+    from models.user import User
+
+    os.chdir(tempfile.mkdtemp())
+    write_users(count)
+    User.load_from_file()
+    rows = [user.to_json(True) for user in User.all()]
+    User.load_from_file()
+
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    users = [User(**User._intern(dict(row))) for row in rows]
+    objects = tracemalloc.get_traced_memory()[0] - before
+    del users
+
+    before = tracemalloc.get_traced_memory()[0]
+    User.load_from_file()
+    resident = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    print("{:>6}: {:6.0f} B/object  {:6.0f} B/user resident".format(
+        os.getenv('MODELS_COMPACT') or 'dict', objects / count,
+        resident / count))
+
+
+def main():
+    """ Run the measurement once per mode, each in a fresh interpreter
+    since the mode is read at import
+    """
+    count = sys.argv[1] if len(sys.argv) > 1 else "100000"
+    if len(sys.argv) > 2:
+        measure(int(count))
+        return
+    print("{} users".format(count))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for mode in MODES:
+        env = dict(os.environ, MODELS_COMPACT=mode,
+                   PYTHONPATH=here)
+        subprocess.run([sys.executable, os.path.abspath(__file__), count,
+                        "measure"], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+""" Multithreaded and multiprocess stress benchmark of the model store
+"""
+import multiprocessing
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+
+from models.base import flush
+from models.user import User
+
+
+def worker(seconds: float, counts: dict, errors: list):
+    """ Mix saves, updates, searches, listings and removals on User
+    until the deadline
+    """
+    rng = random.Random()
+    ops = 0
+    deadline = time.monotonic() + seconds
+    while time.monotonic() < deadline:
+        try:
+            roll = rng.random()
+            if roll < 0.2:
+                user = User(email="{}@example.com".format(rng.random()))
+                user.save()
+            elif roll < 0.3:
+                users = User.all()
+                if users:
+                    user = rng.choice(users)
+                    user.first_name = str(rng.random())
+                    user.save()
+            elif roll < 0.4:
+                users = User.all()
+                if users:
+                    rng.choice(users).remove()
+            elif roll < 0.7:
+                User.search({'email': "{}@example.com".format(rng.random())})
+            else:
+                User.search({'first_name': None})
+            ops += 1
+        except Exception as e:
+            errors.append(repr(e))
+    counts[threading.get_ident()] = ops
+
+
+def stress_threads(threads: int, seconds: float):
+    """ Run `threads` workers in one process and report errors and
+    whether the file matches memory
+    """
+    User.load_from_file()
+    counts, errors = {}, []
+    pool = [threading.Thread(target=worker, args=(seconds, counts, errors))
+            for _ in range(threads)]
+    for thread in pool:
+        thread.start()
+    for thread in pool:
+        thread.join()
+    flush()
+    in_memory = User.count()
+    User.save_to_file()
+    User.load_from_file()
+    print("threads  : {:3d} threads {:8.0f} ops/s  {} errors  "
+          "file matches memory: {}".format(
+              threads, sum(counts.values()) / seconds, len(errors),
+              User.count() == in_memory))
+    for error in sorted(set(errors))[:5]:
+        print("           " + error)
+
+
+def create_users(count: int):
+    """ Save `count` users from a fresh process
+    """
+    User.load_from_file()
+    for i in range(count):
+        User(email="{}-{}@example.com".format(os.getpid(), i)).save()
+    flush()
+
+
+def stress_processes(processes: int, count: int):
+    """ Let `processes` workers save `count` users each into the same
+    file and report the updates that were lost
+    """
+    for path in (".db_User.json", ".db_User.journal"):
+        if os.path.exists(path):
+            os.remove(path)
+    start = time.perf_counter()
+    pool = [multiprocessing.Process(target=create_users, args=(count,))
+            for _ in range(processes)]
+    for process in pool:
+        process.start()
+    for process in pool:
+        process.join()
+    elapsed = time.perf_counter() - start
+    User.load_from_file()
+    expected = processes * count
+    print("processes: {:3d} workers {:8.0f} saves/s  {} of {} users "
+          "lost".format(processes, expected / elapsed,
+                        expected - User.count(), expected))
+
+
+def main():
+    """ Run both stress tests in a temporary directory
+    """
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 8
+    seconds = float(sys.argv[2]) if len(sys.argv) > 2 else 5
+    os.chdir(tempfile.mkdtemp())
+    stress_threads(threads, seconds)
+    stress_processes(4, 200)
+
+
+if __name__ == "__main__":
+    main()
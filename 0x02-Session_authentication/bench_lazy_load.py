@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+""" Startup cost of eager and lazy loading of .db_User.json
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+MODES = ("eager", "lazy")
+
+
+def measure(count: int):
+    """ Report the load time and memory of the mode selected by
+    MODELS_LOAD and the cost of the first accesses; memory is traced
+    on a second load since tracemalloc slows allocations down
+    """
+    from bench_search import write_users
+    from models.user import User
+
+    os.chdir(tempfile.mkdtemp())
+    write_users(count)
+    start = time.perf_counter()
+    User.load_from_file()
+    load = time.perf_counter() - start
+    start = time.perf_counter()
+    User.search({'email': "user{}@example.com".format(count // 2)})
+    search = time.perf_counter() - start
+    start = time.perf_counter()
+    User.all()
+    scan = time.perf_counter() - start
+
+    tracemalloc.start()
+    User.load_from_file()
+    resident, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print("{:>5}: load {:7.0f} ms  resident {:6.1f} MB  peak {:6.1f} MB  "
+          "first search {:6.3f} ms  first full scan {:5.0f} ms".format(
+              os.getenv('MODELS_LOAD'), load * 1000, resident / 2 ** 20,
+              peak / 2 ** 20, search * 1000, scan * 1000))
+
+
+def main():
+    """ Run the measurement once per mode, each in a fresh interpreter
+    since the mode is read at import
+    """
+    count = sys.argv[1] if len(sys.argv) > 1 else "100000"
+    if len(sys.argv) > 2:
+        measure(int(count))
+        return
+    print("{} users".format(count))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for mode in MODES:
+        env = dict(os.environ, MODELS_LOAD=mode, PYTHONPATH=here)
+        subprocess.run([sys.executable, os.path.abspath(__file__), count,
+                        "measure"], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
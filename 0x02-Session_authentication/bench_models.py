@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+""" Benchmark of loading and dumping User objects
+"""
+import os
+import sys
+import tempfile
+import time
+
+from bench_search import write_users
+from models.user import User
+
+
+def timed(func) -> float:
+    """ Duration of one call of `func` in milliseconds
+    """
+    start = time.perf_counter()
+    func()
+    return (time.perf_counter() - start) * 1000
+
+
+def main():
+    """ Time load_from_file, save_to_file and to_json over all users
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    os.chdir(tempfile.mkdtemp())
+    write_users(count)
+
+    load = timed(User.load_from_file)
+    to_json = timed(lambda: [user.to_json() for user in User.all()])
+    first_dump = timed(User.save_to_file)
+    dump = timed(User.save_to_file)
+
+    print("{} users".format(count))
+    print("  load_from_file    {:9.1f} ms".format(load))
+    print("  to_json (list)    {:9.1f} ms".format(to_json))
+    print("  save_to_file      {:9.1f} ms".format(first_dump))
+    print("  save_to_file (2x) {:9.1f} ms".format(dump))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+""" Benchmark of require_auth with a compiled PathMatcher
+"""
+import sys
+import time
+from typing import List
+
+from api.v1.auth.auth import Auth, PathMatcher
+
+
+def linear_require_auth(path: str, excluded_paths: List[str]) -> bool:
+    """ Previous require_auth: one comparison per excluded path
+    """
+    normalized_path = path if path.endswith('/') else path + '/'
+    for excluded_path in excluded_paths:
+        if excluded_path.endswith('*'):
+            if normalized_path.startswith(excluded_path[:-1]):
+                return False
+        else:
+            normalized_excluded = (
+                excluded_path if excluded_path.endswith('/')
+                else excluded_path + '/'
+            )
+            if normalized_path == normalized_excluded:
+                return False
+    return True
+
+
+def main():
+    """ Time linear and compiled matching over the same rules and paths
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    rules = ['/api/v1/resource{}/'.format(i) for i in range(count // 2)]
+    rules += ['/api/v1/static{}/*'.format(i) for i in range(count // 2)]
+    paths = ['/api/v1/users', '/api/v1/resource{}'.format(count // 2 - 1),
+             '/api/v1/static{}/a.css'.format(count // 2 - 1)]
+    matcher = PathMatcher(rules)
+    auth = Auth()
+
+    for path in paths:
+        assert auth.require_auth(path, matcher) == \
+            linear_require_auth(path, rules)
+
+    calls = 10000
+    start = time.perf_counter()
+    for _ in range(calls):
+        for path in paths:
+            linear_require_auth(path, rules)
+    linear = (time.perf_counter() - start) / calls / len(paths) * 1e6
+    start = time.perf_counter()
+    for _ in range(calls):
+        for path in paths:
+            auth.require_auth(path, matcher)
+    compiled = (time.perf_counter() - start) / calls / len(paths) * 1e6
+    print("{} rules: linear {:.2f} us  compiled {:.2f} us".format(
+        count, linear, compiled))
+
+
+if __name__ == "__main__":
+    main()
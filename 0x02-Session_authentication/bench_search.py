@@ -0,0 +1,62 @@
+#!/usr/bin/env python3
+""" Benchmark of indexed vs linear User.search
+"""
+import json
+import os
+import sys
+import tempfile
+import time
+from typing import Callable
+
+from models.user import User
+
+
+def write_users(count: int):
+    """ Write a .db_User.json file holding `count` users
+    """
+    users = {}
+    for i in range(count):
+        user_id = "id-{}".format(i)
+        users[user_id] = {
+            "id": user_id,
+            "email": "user{}@example.com".format(i),
+            "_password": "0" * 64,
+            "first_name": "first{}".format(i),
+            "last_name": "last{}".format(i),
+            "created_at": "2017-09-25T01:55:17",
+            "updated_at": "2017-09-25T01:55:17",
+        }
+    with open(".db_User.json", "w") as f:
+        json.dump(users, f)
+
+
+def per_call(func: Callable, calls: int) -> float:
+    """ Average duration of `func` in microseconds
+    """
+    start = time.perf_counter()
+    for _ in range(calls):
+        func()
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def main():
+    """ Time searches by email with and without the index
+    """
+    sizes = [int(n) for n in sys.argv[1:]] or [10000, 100000, 1000000]
+    os.chdir(tempfile.mkdtemp())
+    for count in sizes:
+        write_users(count)
+        User.load_from_file()
+        email = "user{}@example.com".format(count - 1)
+
+        indexed = per_call(lambda: User.search({'email': email}), 1000)
+        User.indexed_attributes = ()
+        scan = per_call(lambda: User.search({'email': email}), 10)
+        User.indexed_attributes = ('email',)
+
+        print("{:>8} users: indexed {:10.1f} us  scan {:12.1f} us".format(
+            count, indexed, scan))
+
+
+if __name__ == "__main__":
+    main()
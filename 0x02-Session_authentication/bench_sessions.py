@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+""" Memory benchmark of the session stores: bytes per session
+"""
+import sys
+import tracemalloc
+import uuid
+from datetime import datetime
+from typing import Callable
+
+from api.v1.auth.session_store import LRUSessionStore, SessionEntry
+
+
+def bytes_per_session(build: Callable, count: int) -> float:
+    """ Memory allocated by `build` divided by the number of sessions
+    """
+    keys = [str(uuid.uuid4()) for _ in range(count)]
+    users = [str(uuid.uuid4()) for _ in range(count // 4)]
+    now = datetime.now()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    store = build(keys, users, now)
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del store
+    return (after - before) / count
+
+
+def dict_of_dicts(keys, users, now):
+    """ Previous layout: one dict per session
+    """
+    store = {}
+    for i, key in enumerate(keys):
+        store[key] = {'user_id': users[i % len(users)], 'created_at': now}
+    return store
+
+
+def dict_of_entries(keys, users, now):
+    """ Unbounded dict of slotted entries
+    """
+    store = {}
+    for i, key in enumerate(keys):
+        store[key] = SessionEntry(users[i % len(users)], now)
+    return store
+
+
+def lru_of_entries(keys, users, now):
+    """ Bounded LRU store of slotted entries with a per-user limit
+    """
+    store = LRUSessionStore(len(keys), 8)
+    for i, key in enumerate(keys):
+        store[key] = SessionEntry(users[i % len(users)], now)
+    return store
+
+
+def main():
+    """ Print bytes per session for each layout
+    """
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    for build in (dict_of_dicts, dict_of_entries, lru_of_entries):
+        print("{:16} {:8.1f} bytes/session".format(
+            build.__name__, bytes_per_session(build, count)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+""" Side-by-side benchmark of the json and sqlite storage engines
+"""
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Callable
+
+ENGINES = ("json", "sqlite")
+
+
+def per_call(func: Callable, calls: int) -> float:
+    """ Average duration of `func` in microseconds
+    """
+    start = time.perf_counter()
+    for i in range(calls):
+        func(i)
+    return (time.perf_counter() - start) / calls * 1e6
+
+
+def measure(count: int):
+    """ Time the model API on `count` users with the engine selected by
+    MODELS_STORAGE
+    """
+    from bench_search import write_users
+    from models.user import User
+
+    os.chdir(tempfile.mkdtemp())
+    write_users(count)
+    start = time.perf_counter()
+    User.load_from_file()
+    load = (time.perf_counter() - start) * 1e6
+    start = time.perf_counter()
+    User.load_from_file()
+    reload = (time.perf_counter() - start) * 1e6
+    ids = ["id-{}".format(i * 7919 % count) for i in range(1000)]
+
+    timings = [
+        ("load", load),
+        ("reload", reload),
+        ("get", per_call(lambda i: User.get(ids[i]), 1000)),
+        ("search", per_call(lambda i: User.search(
+            {'email': "user{}@example.com".format(i)}), 1000)),
+        ("count", per_call(lambda i: User.count(), 1000)),
+        ("page", per_call(lambda i: User.page(ids[i], 100), 20)),
+        ("save", per_call(lambda i: User.get(ids[i]).save(), 20)),
+        ("remove", per_call(lambda i: User.get(ids[i]).remove(), 20)),
+    ]
+    print("{:>7}: ".format(os.getenv('MODELS_STORAGE')) + "  ".join(
+        "{} {:.0f}".format(name, value) for name, value in timings))
+
+
+def main():
+    """ Run the measurement once per engine, each in a fresh
+    interpreter since the engine is read at import
+    """
+    count = sys.argv[1] if len(sys.argv) > 1 else "100000"
+    if len(sys.argv) > 2:
+        measure(int(count))
+        return
+    print("{} users, microseconds per call".format(count))
+    here = os.path.dirname(os.path.abspath(__file__))
+    for engine in ENGINES:
+        env = dict(os.environ, MODELS_STORAGE=engine, PYTHONPATH=here)
+        subprocess.run([sys.executable, os.path.abspath(__file__), count,
+                        "measure"], env=env, check=True)
+
+
+if __name__ == "__main__":
+    main()
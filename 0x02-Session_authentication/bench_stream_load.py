@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+""" Peak memory of loading a large .db_User.json with json.load versus
+the streaming parser of load_from_file
+"""
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+METHODS = ("json.load", "streaming")
+
+
+def write_file(size_mb: int) -> int:
+    """ Write a .db_User.json of about size_mb megabytes entry by entry
+    and return the number of users
+    """
+    count = 0
+    written = 0
+    with open(".db_User.json", "w") as f:
+        f.write("{")
+        while written < size_mb * 2 ** 20:
+            user_id = "id-{}".format(count)
+            entry = json.dumps({
+                "id": user_id,
+                "email": "user{}@example.com".format(count),
+                "_password": "0" * 64,
+                "first_name": "first{}".format(count),
+                "last_name": "last{}".format(count),
+                "created_at": "2017-09-25T01:55:17",
+                "updated_at": "2017-09-25T01:55:17",
+            })
+            line = '{}"{}": {}'.format(", " if count else "", user_id, entry)
+            f.write(line)
+            written += len(line)
+            count += 1
+        f.write("}")
+    return count
+
+
+def iter_with_json_load(f, chunk_size: int = 0):
+    """ Previous parsing of load_from_file: decode the whole file, then
+    hand out its entries
+    """
+    return iter(json.load(f).items())
+
+
+def measure(method: str):
+    """ Load the file in the current directory with `method`: time a
+    first load, then trace the memory left allocated and the peak of a
+    load with and without the email index
+    """
+    import models.base
+    from models.user import User
+
+    if method == "json.load":
+        models.base.iter_objects = iter_with_json_load
+    start = time.perf_counter()
+    User.load_from_file()
+    print("{:>10}: {:6.1f} s".format(method, time.perf_counter() - start))
+
+    for label, attributes in (("email index", ('email',)),
+                              ("no index", ())):
+        User.indexed_attributes = attributes
+        models.base.DATA["User"] = {}
+        models.base.INDEXES["User"] = {}
+        models.base.INDEXED_VALUES["User"] = {}
+        gc.collect()
+        tracemalloc.start()
+        User.load_from_file()
+        final, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print("{:>24}: final {:7.1f} MB  peak {:7.1f} MB  "
+              "peak/final {:.2f}".format(label, final / 2 ** 20,
+                                         peak / 2 ** 20, peak / final))
+
+
+def main():
+    """ Write the file, then load it once per method, each in a fresh
+    interpreter
+    """
+    if len(sys.argv) > 2 and sys.argv[2] == "measure":
+        measure(sys.argv[1])
+        return
+    size_mb = int(sys.argv[1]) if len(sys.argv) > 1 else 1024
+    here = os.path.dirname(os.path.abspath(__file__))
+    os.chdir(tempfile.mkdtemp())
+    count = write_file(size_mb)
+    print("{} MB file, {} users".format(size_mb, count))
+    env = dict(os.environ, PYTHONPATH=here)
+    for method in METHODS:
+        subprocess.run([sys.executable, os.path.abspath(__file__), method,
+                        "measure"], env=env, check=True)
+    os.remove(".db_User.json")
+
+
+if __name__ == "__main__":
+    main()
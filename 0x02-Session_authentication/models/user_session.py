@@ -1,13 +1,18 @@
 #!/usr/bin/env python3
 """User Session module for storing session data in database
 """
-from models.base import Base
+from models.base import Base, COMPACT
 
 
 class UserSession(Base):
     """User Session class that stores session data in database
     """
 
+    indexed_attributes = ('session_id',)
+    interned_attributes = ('user_id',)
+    if COMPACT:
+        __slots__ = ('user_id', 'session_id')
+
     def __init__(self, *args: list, **kwargs: dict):
         """Initialize a new UserSession instance
         Args:
@@ -0,0 +1,66 @@
+#!/usr/bin/env python3
+"""Tests of Base.reload_if_changed, run in a temporary working directory
+"""
+from models import base
+from models.user_session import UserSession
+from unittest import mock
+import os
+import tempfile
+import threading
+import unittest
+
+
+class TestReloadIfChanged(unittest.TestCase):
+    """reload_if_changed next to writes of the same process
+    """
+
+    def setUp(self):
+        """Runs in an empty directory so UserSession starts empty
+        """
+        cwd = os.getcwd()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        UserSession.load_from_file()
+
+    def test_unchanged_file(self):
+        """Nothing is reloaded until another writer changes the file
+        """
+        UserSession(user_id='user-1', session_id='a').save()
+        self.assertFalse(UserSession.reload_if_changed())
+        UserSession.invalidate()
+        self.assertTrue(UserSession.reload_if_changed())
+        self.assertEqual(UserSession.count(), 1)
+
+    def test_write_behind_keeps_pending_changes(self):
+        """Reloads racing the write-behind flusher never drop changes
+        that are not saved to file yet
+        """
+        patcher = mock.patch.object(base, 'STORAGE', 'write_behind')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        done = threading.Event()
+
+        def reload_loop():
+            """Reloads until the writer is done
+            """
+            while not done.is_set():
+                UserSession.reload_if_changed()
+
+        reloader = threading.Thread(target=reload_loop)
+        reloader.start()
+        try:
+            for i in range(3000):
+                UserSession(user_id='user-1', session_id=str(i)).save()
+        finally:
+            done.set()
+            reloader.join()
+        base.flush()
+        self.assertEqual(UserSession.count(), 3000)
+        UserSession.load_from_file()
+        self.assertEqual(UserSession.count(), 3000)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,325 @@
+#!/usr/bin/env python3
+"""Tests of the session backends, run against an in-process fake Redis
+server and a temporary working directory
+"""
+from api.v1.auth.fake_redis import FakeRedisServer
+from api.v1.auth.session_backend_auth import SessionBackendAuth
+from api.v1.auth.session_backends import (FileSessionBackend,
+                                          MemorySessionBackend,
+                                          RedisSessionBackend,
+                                          session_backend)
+from unittest import mock
+import os
+import tempfile
+import unittest
+
+
+class FakeClock:
+    """Controllable replacement for time.monotonic
+    """
+
+    def __init__(self):
+        """Starts the clock at an arbitrary time
+        """
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        """Returns the current time
+        """
+        return self.now
+
+
+class FakeRequest:
+    """Request carrying only the cookies read by session_cookie
+    """
+
+    def __init__(self, session_id: str = None):
+        """Sets the session cookie when a session ID is given
+        """
+        self.cookies = {}
+        if session_id is not None:
+            self.cookies['_my_session_id'] = session_id
+
+
+def check_auth(test: unittest.TestCase, auth: SessionBackendAuth):
+    """Runs the create/get/destroy checks shared by every backend
+    """
+    test.assertIsNone(auth.create_session(None))
+    test.assertIsNone(auth.create_session(42))
+    session_id = auth.create_session('user-1')
+    test.assertIsInstance(session_id, str)
+    test.assertNotEqual(session_id, auth.create_session('user-1'))
+    test.assertEqual(auth.user_id_for_session_id(session_id), 'user-1')
+    test.assertIsNone(auth.user_id_for_session_id('unknown'))
+    test.assertIsNone(auth.user_id_for_session_id(None))
+    test.assertFalse(auth.destroy_session(None))
+    test.assertFalse(auth.destroy_session(FakeRequest()))
+    test.assertFalse(auth.destroy_session(FakeRequest('unknown')))
+    test.assertTrue(auth.destroy_session(FakeRequest(session_id)))
+    test.assertIsNone(auth.user_id_for_session_id(session_id))
+    test.assertFalse(auth.destroy_session(FakeRequest(session_id)))
+
+
+def use_session_cookie(test: unittest.TestCase):
+    """Names the session cookie read by FakeRequest for one test
+    """
+    patcher = mock.patch.dict(os.environ,
+                              {'SESSION_NAME': '_my_session_id'})
+    patcher.start()
+    test.addCleanup(patcher.stop)
+
+
+class TestRedisSessionBackend(unittest.TestCase):
+    """RedisSessionBackend against FakeRedisServer
+    """
+
+    def setUp(self):
+        """Starts a fake server on a free port and points a backend at it
+        """
+        self.clock = FakeClock()
+        patcher = mock.patch('api.v1.auth.fake_redis.time.monotonic',
+                             self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        use_session_cookie(self)
+        self.server = FakeRedisServer().start()
+        self.addCleanup(self.server.stop)
+        host, port = self.server.address
+        self.backend = RedisSessionBackend(ttl=60, host=host, port=port)
+        self.addCleanup(self.backend._close)
+
+    def test_set_get(self):
+        """A stored session is returned until it expires
+        """
+        self.backend.set('abc', 'user-1')
+        self.assertEqual(self.backend.get('abc'), 'user-1')
+        self.assertIsNone(self.backend.get('missing'))
+
+    def test_set_ex_expires(self):
+        """SET carries EX ttl, so the session is gone once it passes
+        """
+        self.backend.set('abc', 'user-1')
+        ttl = self.backend.pipeline([('TTL', 'session:abc')])[0]
+        self.assertEqual(ttl, 60)
+        self.clock.now += 59
+        self.assertEqual(self.backend.get('abc'), 'user-1')
+        self.clock.now += 2
+        self.assertIsNone(self.backend.get('abc'))
+
+    def test_no_ttl(self):
+        """A backend without ttl stores sessions without expiry
+        """
+        self.backend.ttl = 0
+        self.backend.set('abc', 'user-1')
+        self.assertEqual(self.backend.pipeline([('TTL', 'session:abc')]),
+                         [-1])
+        self.clock.now += 10 ** 6
+        self.assertEqual(self.backend.get('abc'), 'user-1')
+
+    def test_get_many(self):
+        """get_many answers in order, None for unknown sessions
+        """
+        self.backend.set('a', 'user-1')
+        self.backend.set('b', 'user-2')
+        self.assertEqual(self.backend.get_many(['b', 'x', 'a']),
+                         ['user-2', None, 'user-1'])
+        self.assertEqual(self.backend.get_many([]), [])
+
+    def test_pipeline(self):
+        """A pipeline returns one reply per command, in order
+        """
+        replies = self.backend.pipeline([
+            ('SET', 'k', 'v'), ('GET', 'k'), ('DEL', 'k', 'other'),
+            ('GET', 'k'), ('PING',)])
+        self.assertEqual(replies, ['OK', 'v', 1, None, 'PONG'])
+
+    def test_delete(self):
+        """delete tells whether the session existed
+        """
+        self.backend.set('abc', 'user-1')
+        self.assertTrue(self.backend.delete('abc'))
+        self.assertFalse(self.backend.delete('abc'))
+        self.assertIsNone(self.backend.get('abc'))
+
+    def test_delete_expired(self):
+        """An expired session no longer exists for delete
+        """
+        self.backend.set('abc', 'user-1')
+        self.clock.now += 61
+        self.assertFalse(self.backend.delete('abc'))
+
+    def test_error_reply(self):
+        """Error replies raise RuntimeError after every reply is read,
+        so the connection stays usable
+        """
+        with self.assertRaises(RuntimeError) as cm:
+            self.backend.pipeline([('SET', 'k', 'v'), ('NOPE',),
+                                   ('GET', 'k')])
+        self.assertIn('unknown command', str(cm.exception))
+        with self.assertRaises(RuntimeError):
+            self.backend.pipeline([('SET', 'k', 'v', 'EX', 'soon')])
+        self.assertEqual(self.backend.get_many(['x']), [None])
+        self.assertEqual(self.backend.pipeline([('GET', 'k')]), ['v'])
+
+    def test_reconnect_after_close(self):
+        """A dropped connection is reopened by the next command
+        """
+        self.backend.set('abc', 'user-1')
+        self.backend._close()
+        self.assertIsNone(self.backend._sock)
+        self.assertEqual(self.backend.get('abc'), 'user-1')
+        self.assertIsNotNone(self.backend._sock)
+
+    def test_reconnect_after_broken_connection(self):
+        """A command failing on a broken connection reconnects and is
+        retried once
+        """
+        self.backend.set('abc', 'user-1')
+        self.backend._sock.shutdown(2)
+        self.assertEqual(self.backend.get('abc'), 'user-1')
+
+    def test_no_resend_after_send(self):
+        """A connection lost after the commands were sent is not
+        retried, so DEL is not run twice
+        """
+        self.backend.set('abc', 'user-1')
+        read_reply = self.backend._read_reply
+        calls = []
+
+        def drop_first_reply():
+            """Fails the first read as a reset connection would
+            """
+            calls.append(1)
+            if len(calls) == 1:
+                raise ConnectionResetError()
+            return read_reply()
+
+        with mock.patch.object(self.backend, '_read_reply',
+                               drop_first_reply):
+            with self.assertRaises(ConnectionResetError):
+                self.backend.delete('abc')
+        self.assertEqual(len(calls), 1)
+        self.assertIsNone(self.backend.get('abc'))
+
+    def test_select_db(self):
+        """A non-zero db is selected on connect
+        """
+        host, port = self.server.address
+        backend = RedisSessionBackend(host=host, port=port, db=2)
+        self.addCleanup(backend._close)
+        backend.set('abc', 'user-1')
+        self.assertEqual(backend.get('abc'), 'user-1')
+
+    def test_auth(self):
+        """SessionBackendAuth creates, reads and destroys sessions
+        through the redis backend
+        """
+        auth = SessionBackendAuth(self.backend)
+        check_auth(self, auth)
+        session_id = auth.create_session('user-1')
+        self.clock.now += 61
+        self.assertIsNone(auth.user_id_for_session_id(session_id))
+
+
+class TestSessionBackendFactory(unittest.TestCase):
+    """session_backend picks the backend named by SESSION_BACKEND
+    """
+
+    def test_choices(self):
+        """Known names select their backend, memory by default
+        """
+        for kind, expected in (('memory', MemorySessionBackend),
+                               ('file', FileSessionBackend),
+                               ('redis', RedisSessionBackend)):
+            with mock.patch.dict(os.environ, {'SESSION_BACKEND': kind}):
+                self.assertIsInstance(session_backend(), expected)
+        with mock.patch.dict(os.environ):
+            os.environ.pop('SESSION_BACKEND', None)
+            self.assertIsInstance(session_backend(), MemorySessionBackend)
+
+    def test_unknown(self):
+        """An unknown name is rejected instead of falling back to memory
+        """
+        with mock.patch.dict(os.environ, {'SESSION_BACKEND': 'redis '}):
+            with self.assertRaises(ValueError):
+                session_backend()
+
+
+class TestMemoryBackendAuth(unittest.TestCase):
+    """SessionBackendAuth over MemorySessionBackend
+    """
+
+    def setUp(self):
+        """Controls the clock of the backend
+        """
+        self.clock = FakeClock()
+        patcher = mock.patch('api.v1.auth.session_backends.time.monotonic',
+                             self.clock)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        use_session_cookie(self)
+
+    def test_create_get_destroy(self):
+        """Sessions can be created, read and destroyed
+        """
+        auth = SessionBackendAuth(MemorySessionBackend())
+        check_auth(self, auth)
+
+    def test_expiry(self):
+        """Sessions expire ttl seconds after creation
+        """
+        auth = SessionBackendAuth(MemorySessionBackend(ttl=60))
+        session_id = auth.create_session('user-1')
+        self.clock.now += 59
+        self.assertEqual(auth.user_id_for_session_id(session_id), 'user-1')
+        self.clock.now += 2
+        self.assertIsNone(auth.user_id_for_session_id(session_id))
+        self.assertFalse(auth.destroy_session(FakeRequest(session_id)))
+
+
+class TestFileBackendAuth(unittest.TestCase):
+    """SessionBackendAuth over FileSessionBackend
+    """
+
+    def setUp(self):
+        """Runs in an empty directory so UserSession starts empty
+        """
+        cwd = os.getcwd()
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        os.chdir(tmp.name)
+        self.addCleanup(os.chdir, cwd)
+        use_session_cookie(self)
+        from models.user_session import UserSession
+        UserSession.load_from_file()
+
+    def test_create_get_destroy(self):
+        """Sessions can be created, read and destroyed, and are saved
+        to .db_UserSession.json
+        """
+        auth = SessionBackendAuth(FileSessionBackend())
+        check_auth(self, auth)
+        self.assertTrue(os.path.exists('.db_UserSession.json'))
+
+    def test_shared_between_instances(self):
+        """A session created by one instance is seen by another
+        """
+        session_id = SessionBackendAuth(
+            FileSessionBackend()).create_session('user-1')
+        auth = SessionBackendAuth(FileSessionBackend())
+        self.assertEqual(auth.user_id_for_session_id(session_id), 'user-1')
+
+    def test_max_per_user(self):
+        """SESSION_MAX_PER_USER keeps the most recent rows of a user
+        """
+        from models.user_session import UserSession
+        auth = SessionBackendAuth(FileSessionBackend())
+        with mock.patch.dict(os.environ, {'SESSION_MAX_PER_USER': '2'}):
+            session_ids = [auth.create_session('user-1') for _ in range(4)]
+        self.assertEqual(len(UserSession.search({'user_id': 'user-1'})), 2)
+        self.assertEqual(auth.user_id_for_session_id(session_ids[-1]),
+                         'user-1')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,8 +5,14 @@ This module handles all authentication-related operations including
 password hashing, user registration, login validation, and session management.
 """
 
+import asyncio
+import os
+import threading
+import time
 import bcrypt
-from typing import Union
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
 from uuid import uuid4
 from sqlalchemy.orm.exc import NoResultFound
 
@@ -14,17 +20,74 @@ from db import DB
 from user import User
 
 
-def _hash_password(password: str) -> bytes:
+DEFAULT_ROUNDS = 12
+MIN_ROUNDS = 4
+MAX_ROUNDS = 31
+
+
+def _hash_password(password: str, rounds: int = DEFAULT_ROUNDS) -> bytes:
     """
     Hash a password with bcrypt.
 
     Args:
         password (str): The password to hash
+        rounds (int): The bcrypt cost factor
 
     Returns:
         bytes: The salted hash of the password
     """
-    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt())
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds))
+
+
+def _check_password(hashed_password: bytes, password: str) -> bool:
+    """
+    Check a password against a bcrypt hash.
+
+    Args:
+        hashed_password (bytes): The stored bcrypt hash
+        password (str): The password to check
+
+    Returns:
+        bool: True if the password matches the hash
+    """
+    return bcrypt.checkpw(password.encode('utf-8'), hashed_password)
+
+
+def _hash_rounds(hashed_password: bytes) -> int:
+    """
+    Read the cost factor encoded in a bcrypt hash.
+
+    Args:
+        hashed_password (bytes): A hash of the form $2b$<rounds>$...
+
+    Returns:
+        int: The cost factor the hash was made with
+    """
+    return int(hashed_password.split(b'$')[2])
+
+
+def _calibrate_rounds(target_ms: float) -> int:
+    """
+    Benchmark bcrypt on this machine to pick a cost factor.
+
+    Each extra round doubles the work, so calibration itself costs about
+    twice the target.
+
+    Args:
+        target_ms (float): The hashing time to aim for, in milliseconds
+
+    Returns:
+        int: The highest cost factor hashing within target_ms
+    """
+    rounds = MIN_ROUNDS
+    while rounds < MAX_ROUNDS:
+        start = time.perf_counter()
+        bcrypt.hashpw(b'calibration', bcrypt.gensalt(rounds))
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if elapsed_ms * 2 > target_ms:
+            break
+        rounds += 1
+    return rounds
 
 
 def _generate_uuid() -> str:
@@ -37,6 +100,206 @@ def _generate_uuid() -> str:
     return str(uuid4())
 
 
+class PasswordHasher:
+    """
+    Bounded thread pool running bcrypt off the calling thread.
+
+    bcrypt releases the GIL while hashing, so up to max_workers calls run
+    in parallel. Once max_pending calls are in flight, submitting blocks
+    the caller instead of growing the queue; the async variants wait for
+    a slot without blocking the event loop.
+    """
+
+    def __init__(self, max_workers: Optional[int] = None,
+                 max_pending: Optional[int] = None,
+                 rounds: int = DEFAULT_ROUNDS) -> None:
+        """
+        Start the worker pool.
+
+        Args:
+            max_workers (int): Worker threads, defaults to the CPU count
+            max_pending (int): Calls in flight before submitters block
+            rounds (int): The bcrypt cost factor for new hashes
+        """
+        self.rounds = rounds
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_pending = max_pending or self.max_workers * 4
+        self._executor = ThreadPoolExecutor(self.max_workers,
+                                            thread_name_prefix='bcrypt')
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._lock = threading.Lock()
+        self._waiters = deque()
+        self._queued = 0
+        self._started = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _run(self, submitted: float, func: Callable, *args):
+        """
+        Record how long a call waited for a worker, then run it.
+        """
+        wait = time.monotonic() - submitted
+        with self._lock:
+            self._queued -= 1
+            self._started += 1
+            self._total_wait += wait
+            self._max_wait = max(self._max_wait, wait)
+        return func(*args)
+
+    def _submit(self, func: Callable, *args) -> Future:
+        """
+        Schedule func on the pool once a pending slot is free.
+        """
+        self._slots.acquire()
+        return self._schedule(func, *args)
+
+    async def _submit_async(self, func: Callable, *args):
+        """
+        Wait for a pending slot without blocking the event loop, then
+        run func on the pool and await its result.
+
+        A full pool parks the coroutine on a future of its own loop, which
+        the completion of another call hands its slot to.
+        """
+        if not self._slots.acquire(blocking=False):
+            loop = asyncio.get_running_loop()
+            waiter = loop.create_future()
+            with self._lock:
+                granted = self._slots.acquire(blocking=False)
+                if not granted:
+                    self._waiters.append((loop, waiter))
+            if not granted:
+                try:
+                    await waiter
+                except asyncio.CancelledError:
+                    with self._lock:
+                        if (loop, waiter) in self._waiters:
+                            self._waiters.remove((loop, waiter))
+                    if waiter.done() and not waiter.cancelled():
+                        self._release()
+                    raise
+        return await asyncio.wrap_future(self._schedule(func, *args))
+
+    def _release(self) -> None:
+        """
+        Hand a freed slot to the oldest async waiter, or return it
+        to the semaphore.
+        """
+        with self._lock:
+            if not self._waiters:
+                self._slots.release()
+                return
+            loop, waiter = self._waiters.popleft()
+        try:
+            loop.call_soon_threadsafe(self._grant, waiter)
+        except RuntimeError:
+            self._release()
+
+    def _grant(self, waiter: asyncio.Future) -> None:
+        """
+        Wake a waiter with the slot, passing the slot on if it was
+        cancelled meanwhile; runs on the loop of the waiter.
+        """
+        if waiter.cancelled():
+            self._release()
+        else:
+            waiter.set_result(None)
+
+    def _schedule(self, func: Callable, *args) -> Future:
+        """
+        Schedule func on the pool; the caller holds a pending slot, which
+        is released when the call completes.
+        """
+        with self._lock:
+            self._queued += 1
+        try:
+            future = self._executor.submit(self._run, time.monotonic(),
+                                           func, *args)
+        except Exception:
+            with self._lock:
+                self._queued -= 1
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return future
+
+    def submit_hash(self, password: str) -> Future:
+        """
+        Hash a password on the pool.
+
+        Returns:
+            Future: Resolves to the salted bcrypt hash
+        """
+        return self._submit(_hash_password, password, self.rounds)
+
+    def submit_verify(self, hashed_password: bytes, password: str) -> Future:
+        """
+        Verify a password on the pool.
+
+        Returns:
+            Future: Resolves to True if the password matches the hash
+        """
+        return self._submit(_check_password, hashed_password, password)
+
+    async def hash_async(self, password: str) -> bytes:
+        """
+        Awaitable variant of submit_hash.
+        """
+        return await self._submit_async(_hash_password, password,
+                                        self.rounds)
+
+    async def verify_async(self, hashed_password: bytes,
+                           password: str) -> bool:
+        """
+        Awaitable variant of submit_verify.
+        """
+        return await self._submit_async(_check_password, hashed_password,
+                                        password)
+
+    def hash_many(self, passwords: Iterable[str]) -> List[bytes]:
+        """
+        Hash several passwords in parallel.
+
+        Returns:
+            List[bytes]: The hashes, in the order of the passwords
+        """
+        futures = [self.submit_hash(password) for password in passwords]
+        return [future.result() for future in futures]
+
+    def verify_many(self, pairs: Iterable[Tuple[bytes, str]]) -> List[bool]:
+        """
+        Verify several (hashed_password, password) pairs in parallel.
+
+        Returns:
+            List[bool]: One result per pair, in order
+        """
+        futures = [self.submit_verify(hashed, password)
+                   for hashed, password in pairs]
+        return [future.result() for future in futures]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Backpressure metrics for the pool.
+
+        Returns:
+            Dict[str, float]: Calls waiting for a worker, calls started,
+            and the mean and max seconds spent waiting
+        """
+        with self._lock:
+            return {
+                'queue_depth': self._queued,
+                'started': self._started,
+                'avg_wait': self._total_wait / max(self._started, 1),
+                'max_wait': self._max_wait,
+            }
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker pool.
+        """
+        self._executor.shutdown(wait=wait)
+
+
 class Auth:
     """
     Auth class to interact with the authentication database.
@@ -46,8 +309,17 @@ class Auth:
     """
 
     def __init__(self):
-        """Initialize the Auth class with a database instance."""
+        """
+        Initialize the Auth class with a database instance.
+
+        If BCRYPT_TARGET_MS is set, the bcrypt cost factor is calibrated
+        at startup to hash in about that many milliseconds.
+        """
         self._db = DB()
+        target_ms = os.getenv('BCRYPT_TARGET_MS')
+        rounds = (_calibrate_rounds(float(target_ms)) if target_ms
+                  else DEFAULT_ROUNDS)
+        self._hasher = PasswordHasher(rounds=rounds)
 
     def register_user(self, email: str, password: str) -> User:
         """
@@ -64,13 +336,16 @@ class Auth:
             self._db.find_user_by(email=email)
             raise ValueError(f"User {email} already exists")
         except NoResultFound:
-            hashed_password = _hash_password(password)
+            hashed_password = self._hasher.submit_hash(password).result()
             return self._db.add_user(email, hashed_password)
 
     def valid_login(self, email: str, password: str) -> bool:
         """
         Validate user login credentials.
 
+        A valid password whose stored hash uses a different cost factor
+        than the current one is rehashed and saved.
+
         Args:
             email (str): The user's email address
             password (str): The user's password
@@ -80,10 +355,17 @@ class Auth:
         """
         try:
             user = self._db.find_user_by(email=email)
-            return bcrypt.checkpw(password.encode('utf-8'), user.hashed_password)
         except NoResultFound:
             return False
 
+        if not self._hasher.submit_verify(
+                user.hashed_password, password).result():
+            return False
+        if _hash_rounds(user.hashed_password) != self._hasher.rounds:
+            hashed_password = self._hasher.submit_hash(password).result()
+            self._db.update_user(user.id, hashed_password=hashed_password)
+        return True
+
     def create_session(self, email: str) -> Union[str, None]:
         """
         Create a new session for a user.
@@ -138,7 +420,7 @@ class Auth:
         """
         try:
             user = self._db.find_user_by(reset_token=reset_token)
-            hashed_password = _hash_password(password)
+            hashed_password = self._hasher.submit_hash(password).result()
             self._db.update_user(
                 user.id,
                 hashed_password=hashed_password,